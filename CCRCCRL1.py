@@ -1,6 +1,8 @@
 # Completed with correct output
 import polars as pl
 from reader import load_input
+from sortorder import order_by
+from keys import encode_together, decode_keys
 
 #-------------------------------------------------------------------#
 # Original Program: CCRCCRL1                                        #
@@ -22,16 +24,22 @@ primary = load_input("RLENCA_NONJOINT")   # PRIMREC
 ccrlen1 = load_input("RLNSHIP_RLNIND")   # Individual
 ccrlen  = load_input("RLNSHIP_RLNORG")   # Organisation
 
+# customer numbers as UInt64 in every frame when they all fit (keys.py)
+primary, ccrlen1, ccrlen = encode_together([
+    (primary.with_columns(pl.col("CUSTNO").cast(pl.Utf8)), "CUSTNO"),
+    (ccrlen1, ["CUSTNO1", "CUSTNO2"]),
+    (ccrlen, ["CUSTNO1", "CUSTNO2"]),
+])
+
 #------------------------------------------#
 # Personal account file (No Joint Account) #
 #------------------------------------------#
 primary = primary.select([
     pl.col("ACCTNO").cast(pl.Utf8),
     pl.col("ACCTCODE").cast(pl.Utf8),
-    pl.col("CUSTNO").cast(pl.Utf8)
+    pl.col("CUSTNO")
 ])
 
-primary = primary.sort("CUSTNO")
 print("CA RELATIONSHIP")
 print(primary.head(5))
 
@@ -50,11 +58,11 @@ ccrlen1 = ccrlen1.rename({
 })
 
 ccrlen1 = ccrlen1.select([
-    pl.col("CUSTNO1").cast(pl.Utf8).str.zfill(11),
+    pl.col("CUSTNO1"),
     pl.col("CUSTTYPE1").cast(pl.Utf8),
     pl.col("RLENCODE1").cast(pl.Utf8),
     pl.col("DESC1").cast(pl.Utf8),
-    pl.col("CUSTNO").cast(pl.Utf8).str.zfill(11),
+    pl.col("CUSTNO"),
     pl.col("CUSTTYPE").cast(pl.Utf8),
     pl.col("RLENCODE").cast(pl.Utf8),
     pl.col("DESC").cast(pl.Utf8),
@@ -64,7 +72,7 @@ ccrlen1 = ccrlen1.select([
     pl.col("ALIAS").cast(pl.Utf8)
 ])
 
-ccrlen1 = ccrlen1.sort("CUSTNO")
+ccrlen1 = order_by(ccrlen1, "CUSTNO")
 print("CC RELATIONSHIP")
 print(ccrlen1.head(5))
 
@@ -83,11 +91,11 @@ ccrlen = ccrlen.rename({
 })
 
 ccrlen = ccrlen.select([
-    pl.col("CUSTNO1").cast(pl.Utf8).str.zfill(11),
+    pl.col("CUSTNO1"),
     pl.col("CUSTTYPE1").cast(pl.Utf8),
     pl.col("RLENCODE1").cast(pl.Utf8),
     pl.col("DESC1").cast(pl.Utf8),
-    pl.col("CUSTNO").cast(pl.Utf8).str.zfill(11),
+    pl.col("CUSTNO"),
     pl.col("CUSTTYPE").cast(pl.Utf8),
     pl.col("RLENCODE").cast(pl.Utf8),
     pl.col("DESC").cast(pl.Utf8),
@@ -97,7 +105,6 @@ ccrlen = ccrlen.select([
     pl.col("ALIAS").cast(pl.Utf8)
 ])
 
-ccrlen = ccrlen.sort("CUSTNO")
 print("CC RELATIONSHIP")
 print(ccrlen.head(5))
 
@@ -115,7 +122,7 @@ cc_primary = (
     ])
 )
 
-cc_primary = cc_primary.sort(["CUSTNO", "ACCTCODE", "ACCTNO"])
+cc_primary = order_by(cc_primary, ["CUSTNO", "ACCTCODE", "ACCTNO"])
 print("CCRLEN + PRIM")
 print(cc_primary.head(5))
 
@@ -124,8 +131,10 @@ print(cc_primary.head(5))
 # ----------------------------------------------#
 out = pl.concat([cc_primary, ccrlen1], how="diagonal")
 
+# customer numbers back to Z11. text for the output files
 out1 = (
-    out.select([
+    decode_keys(out, ["CUSTNO1", "CUSTNO"])
+    .select([
         "CUSTNO1","CUSTTYPE1","RLENCODE1","DESC1",
         "CUSTNO","CUSTTYPE","RLENCODE","DESC",
         "ACCTNO","ACCTCODE","CUSTNAME1","ALIAS1",
@@ -1,7 +1,13 @@
 # Completed with correct output
 import polars as pl
 from datetime import date
-from reader import load_input
+from reader import scan_input, ENGINE
+from writer import publish
+from sasops import nodupkey
+from dimensions import dimension
+from enrich import profile, attach
+from preview import preview
+from profiler import checkpoint, step
 
 #-------------------------------------------------------------------#
 # Original Program: CCRCCRLN                                        #
@@ -13,203 +19,109 @@ from reader import load_input
 # ESMR 2021-00002352                                                #
 # TO EXCLUDE RECORD WITH EXPIRED DATE IN RLEN CC FILE               #
 #-------------------------------------------------------------------#
+# The whole job is one lazy plan, collected once at the end, so     #
+# Polars prunes unused columns and reuses the shared scans and the  #
+# LEFTOUT / all_output subplans. The SAS PROC SORTs that only       #
+# prepared a MERGE are dropped: joins do not need sorted input and  #
+# only the final output order matters. Step previews are opt-in     #
+# (CIS_PREVIEW=1, see preview.py).                                  #
+#-------------------------------------------------------------------#
 
 #--------------------------------#
 # Part 1 - PROCESSING LEFT  SIDE #
 #--------------------------------#
 
 #READ PARQUET FILE
-INFILE1 = load_input("RLENCC_FB")
-CCCODE = load_input("BANKCTRL_RLENCODE_CC") 
-NAMEFILE = load_input("PRIMNAME_OUT")
-ALIASFIL = load_input("ALLALIAS_OUT")
-CUSTFILE = load_input("ALLCUST_FB")
-
-#RBP2.B033.BANKCTRL.RLENCODE.CC
-cccode = CCCODE.select(["RLENTYPE", "RLENCODE","RLENDESC"]).rename({"RLENTYPE": "TYPE","RLENCODE": "CODE1", "RLENDESC": "DESC1"})
-cccode = cccode.unique(subset=["CODE1"])
-print("RELATION FILE:")
-print(cccode.head(5))
-
-#RBP2.B033.UNLOAD.ALLCUST.FB
-#Left Side Only
-ciscust = CUSTFILE.select(["CUSTNO", "TAXID","BASICGRPCODE"]).rename({"CUSTNO": "CUSTNO1","TAXID": "OLDIC1", "BASICGRPCODE": "BASICGRPCODE1"})
-ciscust = ciscust.unique(subset=["CUSTNO1"])
-print("ALL CUSTOMER FILE:")
-print(ciscust.head(5))
+INFILE1 = scan_input("RLENCC_FB")
+RLENCODE = dimension("BANKCTRL_RLENCODE_CC", "RLENCODE", "RLENDESC")  #RBP2.B033.BANKCTRL.RLENCODE.CC, code -> description
+NAMEFILE = scan_input("PRIMNAME_OUT")
+ALIASFIL = scan_input("ALLALIAS_OUT")
+CUSTFILE = scan_input("ALLCUST_FB")
 
+#Customer tables, keyed by CUSTNO; each is joined once for both sides (enrich.py)
 #RBP2.B033.UNLOAD.PRIMNAME.OUT
-cisname = NAMEFILE.select(["CUSTNO", "INDORG","CUSTNAME"]).rename({"CUSTNO": "CUSTNO1","INDORG": "INDORG1", "CUSTNAME": "CUSTNAME1"})
-cisname = cisname.unique(subset=["CUSTNO1"])
-print("Customer Name FILE:")
-print(cisname.head(5))
+cisname = nodupkey(NAMEFILE.select(["CUSTNO", "INDORG", "CUSTNAME"]), "CUSTNO")
+preview("Customer Name FILE", cisname)
 
 #RBP2.B033.UNLOAD.ALLALIAS.OUT
-cisalias = ALIASFIL.select(["CUSTNO", "NAME_LINE"]).rename({"CUSTNO": "CUSTNO1","NAME_LINE": "ALIAS1"})
-cisalias = cisalias.sort("CUSTNO1")
-print("ALIAS FILE:")
-print(cisalias.head(5))
+cisalias = ALIASFIL.select(["CUSTNO", pl.col("NAME_LINE").alias("ALIAS")])
+preview("ALIAS FILE", cisalias)
+
+#RBP2.B033.UNLOAD.ALLCUST.FB
+ciscust = nodupkey(CUSTFILE.select(["CUSTNO", pl.col("TAXID").alias("OLDIC"), "BASICGRPCODE"]), "CUSTNO")
+preview("ALL CUSTOMER FILE", ciscust)
 
 #RBP2.B033.UNLOAD.RLEN#CC.FB
+#Only these 6 columns and the unexpired rows are read from the scan
 ccrlen1 = INFILE1.select(["CUSTNO", "EFFDATE","CUSTNO2","CODE1","CODE2","EXPIRE_DATE"]).rename({"CUSTNO": "CUSTNO1","EXPIRE_DATE": "EXPDATE1"})
+ccrlen1 = ccrlen1.filter(pl.col("EXPDATE1").str.strip_chars() == "")
 ccrlen1 = ccrlen1.with_columns([
     pl.col("EXPDATE1").str.strip_chars().alias("EXPDATE1"),
     pl.col("EXPDATE1")
       .str.strptime(pl.Date, "%Y-%m-%d", strict=False)
       .alias("EXPDATE")
 ])
-ccrlen1 = ccrlen1.filter(pl.col("EXPDATE1") == "")
 ccrlen1 = ccrlen1.with_columns([
     pl.col("EFFDATE").cast(pl.Int64).alias("EFFDATE"),
     pl.col("CODE1").cast(pl.Int64).alias("CODE1"),
     pl.col("CODE2").cast(pl.Int64).alias("CODE2")
 ])
-ccrlen1 = ccrlen1.sort("CODE1")
-print("CC FILE:")
-print(ccrlen1.head(5))
+preview("CC FILE", ccrlen1)
 
 #-------------------------------------------------#
 #LOOKUP CONTROL FILES FOR DESCRIPTIONS (Left Side)#
 #-------------------------------------------------#
 
 #Merge CCRLEN1 and CCCODES to get RELATIONSHIP CODES
-IDX_L01 = ccrlen1.join(
-    cccode,
-    on="CODE1",
-    how="left"
-)
-IDX_L01 = IDX_L01.sort("CUSTNO1")
-print("IDX_L01:")
-print(IDX_L01.head(5))
+IDX_L01 = ccrlen1.with_columns(RLENCODE.lookup("CODE1", rename={"RLENDESC": "DESC1"}))
+preview("IDX_L01", IDX_L01)
 
-#Merge IDX_L01 and namefile to get CIS INDORG + NAME
-IDX_L02 = IDX_L01.join(
-    cisname,
-    on="CUSTNO1",
-    how="left"
-)
-print("IDX_L02:")
-print(IDX_L02.head(5))
-
-#Merge IDX_L02 and aliasfil to get CIS ALIAS
-IDX_L03 = IDX_L02.join(
-    cisalias,
-    on="CUSTNO1",
-    how="left"
-)
-print("IDX_L03:")
-print(IDX_L03.head(5))
+#Name, alias and allcust of every customer on either side, looked up once
+CUSTPROF = profile(ccrlen1, ["CUSTNO1", "CUSTNO2"], [cisname, cisalias, ciscust])
+preview("CUSTOMER PROFILE", CUSTPROF)
 
-#Merge IDX_L03 and allcust to get CIS ALIAS
-IDX_L04 = IDX_L03.join(
-    ciscust,
-    on="CUSTNO1",
-    how="left"
-)
-print("IDX_L04:")
-print(IDX_L04.head(5))
+#Attach CIS INDORG + NAME, ALIAS, OLDIC + BASICGRPCODE of CUSTNO1
+IDX_L04 = attach(IDX_L01, CUSTPROF, "CUSTNO1", "1")
+preview("IDX_L04", IDX_L04)
 
 #----------------------------------#
 # OUTPUT DETAIL REPORT (LEFT SIDE) #
 #----------------------------------#
 LEFTOUT = IDX_L04.select(["CUSTNO1","INDORG1","CODE1","DESC1","CUSTNO2","CODE2","EXPDATE","CUSTNAME1","ALIAS1","OLDIC1","BASICGRPCODE1","EFFDATE"])
-print("LEFTOUT:")
-print(LEFTOUT.head(5))
+preview("LEFTOUT", LEFTOUT)
 
 #--------------------------------#
 # Part 2 - PROCESSING RIGHT SIDE #
 #--------------------------------#
-#READ PARQUET FILE
+#Same customer profile as Part 1: the plan builds it once
 INFILE2 = LEFTOUT
-CCCODE = pl.read_parquet("cis_internal/rawdata_converted/BANKCTRL_RLENCODE_CC.parquet") 
-NAMEFILE = pl.read_parquet("cis_internal/rawdata_converted/PRIMNAME_OUT.parquet")
-ALIASFIL = pl.read_parquet("cis_internal/rawdata_converted/ALLALIAS_OUT.parquet")
-CUSTFILE = pl.read_parquet("cis_internal/rawdata_converted/ALLCUST_FB.parquet")
-
-
-#RBP2.B033.BANKCTRL.RLENCODE.CC
-cccode = CCCODE.select(["RLENTYPE", "RLENCODE","RLENDESC"]).rename({"RLENTYPE": "TYPE","RLENCODE": "CODE2", "RLENDESC": "DESC2"})
-cccode = cccode.sort("CODE2")
-print("RELATION FILE:")
-print(cccode.head(5))
-
-#RBP2.B033.UNLOAD.ALLCUST.FB
-#Right Side Only
-ciscust = CUSTFILE.select(["CUSTNO", "TAXID","BASICGRPCODE"]).rename({"CUSTNO": "CUSTNO2","TAXID": "OLDIC2", "BASICGRPCODE": "BASICGRPCODE2"})
-ciscust = ciscust.unique(subset=["CUSTNO2"])
-print("ALL CUSTOMER FILE:")
-print(ciscust.head(5))
-
-#RBP2.B033.UNLOAD.PRIMNAME.OUT
-cisname = NAMEFILE.select(["CUSTNO", "INDORG","CUSTNAME"]).rename({"CUSTNO": "CUSTNO2","INDORG": "INDORG2", "CUSTNAME": "CUSTNAME2"})
-cisname = cisname.unique(subset=["CUSTNO2"])
-print("Customer Name FILE:")
-print(cisname.head(5))
-
-#RBP2.B033.UNLOAD.ALLALIAS.OUT
-cisalias = ALIASFIL.select(["CUSTNO", "NAME_LINE"]).rename({"CUSTNO": "CUSTNO2","NAME_LINE": "ALIAS2"})
-cisalias = cisalias.sort("CUSTNO2")
-print("ALIAS FILE:")
-print(cisalias.head(5))
 
 #RBP2.B033.UNLOAD.RLEN#CC.FB
 ccrlen2 = INFILE2.select(["CUSTNO1", "INDORG1","CODE1","DESC1","CUSTNO2","CODE2","EXPDATE","CUSTNAME1","ALIAS1","OLDIC1","BASICGRPCODE1","EFFDATE"])
 ccrlen2 = ccrlen2.with_columns(
-    ccrlen2["EXPDATE"].dt.year().alias("EXPYY"),
-    ccrlen2["EXPDATE"].dt.month().alias("EXPMM"),
-    ccrlen2["EXPDATE"].dt.day().alias("EXPDD")
+    pl.col("EXPDATE").dt.year().alias("EXPYY"),
+    pl.col("EXPDATE").dt.month().alias("EXPMM"),
+    pl.col("EXPDATE").dt.day().alias("EXPDD")
 )
-ccrlen2 = ccrlen2.sort("CODE2")
-print("CC FILE:")
-print(ccrlen2.head(5))
+preview("CC FILE", ccrlen2)
 
 #---------------------------------------#
 # MERGE  CONTROL FILES FOR DESCRIPTIONS #
 #---------------------------------------#
 
 #Merge CCRLEN1 and CCCODES to get RELATIONSHIP CODES
-IDX_R01 = ccrlen2.join(
-    cccode,
-    on="CODE2",
-    how="left"
-)
-IDX_R01 = IDX_R01.sort("CUSTNO2")
-print("IDX_R01:")
-print(IDX_R01.head(5))
+IDX_R01 = ccrlen2.with_columns(RLENCODE.lookup("CODE2", rename={"RLENDESC": "DESC2"}))
+preview("IDX_R01", IDX_R01)
 
-#Merge IDX_R01 and namefile to get CIS INDORG + NAME
-IDX_R02 = IDX_R01.join(
-    cisname,
-    on="CUSTNO2",
-    how="left"
-)
-print("IDX_R02:")
-print(IDX_R02.head(5))
-
-#Merge IDX_R02 and aliasfil to get CIS ALIAS
-IDX_R03 = IDX_R02.join(
-    cisalias,
-    on="CUSTNO2",
-    how="left"
-)
-print("IDX_R03:")
-print(IDX_R03.head(5))
-
-#Merge IDX_R03 and allcust to get CIS ALIAS
-IDX_R04 = IDX_R03.join(
-    ciscust,
-    on="CUSTNO2",
-    how="left"
-)
-print("IDX_R04:")
-print(IDX_R04.head(5))
+#Attach the same profile for CUSTNO2
+IDX_R04 = attach(IDX_R01, CUSTPROF, "CUSTNO2", "2")
+preview("IDX_R04", IDX_R04)
 
 #-----------------------------------#
 # OUTPUT DETAIL REPORT (Right SIDE) #
 #-----------------------------------#
 RIGHTOUT = IDX_R04.select(["CUSTNO2","INDORG2","CODE2","DESC2","CUSTNO1","CODE1","EXPDATE","CUSTNAME2","ALIAS2","OLDIC2","BASICGRPCODE2","EFFDATE"])
-print("RIGHTOUT:")
-print(RIGHTOUT.head(5))
+preview("RIGHTOUT", RIGHTOUT)
 
 #---------------------------------------#
 # Part 3 - FILE TO SEARCH ONE SIDE ONLY #
@@ -220,12 +132,10 @@ today = date.today()
 date1 = today.strftime("%m%d%Y")
 
 INPUT1 = LEFTOUT.select(["CUSTNO1","INDORG1","CODE1","DESC1","CUSTNO2","CODE2","EXPDATE","CUSTNAME1","ALIAS1","OLDIC1","BASICGRPCODE1","EFFDATE"])
-print("INPUT1:")
-print(INPUT1.head(5))
+preview("INPUT1", INPUT1)
 
 INPUT2 = RIGHTOUT.select(["CUSTNO2","INDORG2","CODE2","DESC2","CUSTNO1","CODE1","EXPDATE","CUSTNAME2","ALIAS2","OLDIC2","BASICGRPCODE2","EFFDATE"])
-print("INPUT2:")
-print(INPUT2.head(5))
+preview("INPUT2", INPUT2)
 
 alloutput = INPUT1.join(
     INPUT2,
@@ -239,18 +149,13 @@ all_output = alloutput.select([
     "CUSTNAME1","ALIAS1","CUSTNAME2","ALIAS2","OLDIC1","BASICGRPCODE1","OLDIC2","BASICGRPCODE2","EFFDATE"
 ])
 
-# Keep a copy before deduplication
-all_output_full = all_output.clone()
-
-# Deduplicate based on relationship keys
-all_output_unique = all_output.unique(subset=["CUSTNO1","CUSTNO2","CODE1","CODE2"]).sort("CUSTNO1")
+# Deduplicate based on relationship keys; the rows dropped are the duplicates
+all_output_unique, duplicates = nodupkey(all_output, ["CUSTNO1","CUSTNO2","CODE1","CODE2"], dupout=True)
 
-# Find duplicates by doing an anti-join
-duplicates = all_output_full.join(
-    all_output_unique,
-    on=["CUSTNO1","CUSTNO2","CODE1","CODE2"],
-    how="anti"
-)
+# One optimized plan for both outputs; all_output is computed once
+with step("Parts 1-3 collect") as s:
+    all_output_unique, duplicates = pl.collect_all([all_output_unique, duplicates], engine=ENGINE)
+    s.output(all_output_unique)
 
 print("Alloutput (unique):")
 print(all_output_unique.head(5))
@@ -258,9 +163,12 @@ print(all_output_unique.head(5))
 print("Duplicate rows removed:")
 print(duplicates.head(5))
 
-# Save outputs
-all_output_unique.write_csv("cis_internal/output/RLNSHIP.csv")
-all_output_unique.write_parquet("cis_internal/output/RLNSHIP.parquet")
+# Save outputs (handed to CCRCCRL1 in memory, persisted in the background)
+publish("RLNSHIP", all_output_unique, "cis_internal/output/RLNSHIP.csv", "cis_internal/output/RLNSHIP.parquet")
+publish("RLNSHIP_DUPLICATES", duplicates, "cis_internal/output/RLNSHIP_DUPLICATES.csv", "cis_internal/output/RLNSHIP_DUPLICATES.parquet")
 
-duplicates.write_csv("cis_internal/output/RLNSHIP_DUPLICATES.csv")
-duplicates.write_parquet("cis_internal/output/RLNSHIP_DUPLICATES.parquet")
+# CCRCCRL1 ORGONLY step: SORT OUTFIL INCLUDE=(55,1,CH,EQ,C'O'/'I') = INDORG2
+publish("RLNSHIP_RLNORG", all_output_unique.filter(pl.col("INDORG2") == "O"), "cis_internal/output/RLNSHIP_RLNORG.parquet")
+publish("RLNSHIP_RLNIND", all_output_unique.filter(pl.col("INDORG2") == "I"), "cis_internal/output/RLNSHIP_RLNIND.parquet")
+# only queues the writes; each persist is recorded as its own step
+checkpoint("Publish RLNSHIP outputs", all_output_unique)
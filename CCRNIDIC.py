@@ -1,6 +1,9 @@
 # Completed with correct output AT 8SEP2025
 import polars as pl
 from reader import load_input
+from writer import publish
+from keys import encode_together, decode_keys
+from sasops import nodupkey
 
 #---------------------------------------------------------------------#
 # Original Program: CCRNIDIC                                          #
@@ -15,10 +18,13 @@ from reader import load_input
 #------------------------#
 # READ PARQUET DATASETS  #
 #------------------------#
-main_df = load_input("CIDICUST_FB")
-indv_df = load_input("CIDINDVT_FB")
-org_df  = load_input("CIDIORGT_FB")
-cart_df = load_input("CIDICART_FB")
+# customer numbers are joined and deduplicated as UInt64 (keys.py)
+main_df, indv_df, org_df, cart_df = encode_together([
+    (load_input("CIDICUST_FB"), "CISNO"),
+    (load_input("CIDINDVT_FB"), "CUSTNO"),
+    (load_input("CIDIORGT_FB"), "CUSTNO"),
+    (load_input("CIDICART_FB"), "CUSTNO"),
+])
 
 #-----------------------------------------------#
 # Part 1 - Process Individual Part              # 
@@ -33,7 +39,6 @@ main_indv = (
         "CISNO", "BANKNO", "MAIN_ENTITY_TYPE", "BRANCH",
         "CUSTNAME", "BIRTHDATE", "GENDER"
     ])
-    .sort("CISNO")
 )
 
 print("MAIN (INDIVIDUAL)")
@@ -76,7 +81,6 @@ indv = (
         "EMPLOYMENT_TYPE","EMPLOYMENT_SECTOR","EMPLOYMENT_LAST_UPDATE",
         "EMPLOYMENT_LAST_UPTIME","INCOME_AMT","ENABLE_TAB"
     ])
-    .sort(["CISNO","IDTYPE","ID"])
 )
 
 print("INDIVIDUAL FILE")
@@ -100,10 +104,9 @@ cart = (
     cart_df
     .select([
         "APPL_CODE","APPL_NO","PRI_SEC","RELATIONSHIP",
-        pl.col("CISNO").cast(pl.Utf8).str.zfill(11),"IDTYPE","ID","AA_REF_NO","EFF_DATE",
+        "CISNO","IDTYPE","ID","AA_REF_NO","EFF_DATE",
         "EFF_TIME","LAST_MNT_DATE","LAST_MNT_TIME"
     ])
-    .sort(["CISNO","IDTYPE","ID"])
 )
 
 print("CART FILE")
@@ -128,9 +131,8 @@ indvdly = (
     main_indv.join(custinfo_indv, on="CISNO", how="inner")
 )
 
-# Create index equivalent (set unique keys)
-indvdly = indvdly.unique(subset=["CISNO","IDTYPE","ID"])
-indvdly = indvdly.sort("CISNO")
+# Create index equivalent (set unique keys), in MERGE BY order
+indvdly = nodupkey(indvdly, ["CISNO","IDTYPE","ID"])
 
 print("FINAL INDIVIDUAL DATASET")
 print(indvdly.head(5))
@@ -149,7 +151,6 @@ main_org = (
         "CISNO", "BANKNO", "MAIN_ENTITY_TYPE", "BRANCH",
         "CUSTNAME", "BIRTHDATE", "GENDER"
     ])
-    .sort("CISNO")
 )
 
 print("MAIN (ORGANISATION)")
@@ -188,7 +189,6 @@ org = (
         "PHONE_PRIMARY","PHONE_SECONDARY","PHONE_FAX","PHONE_MOBILE",
         "PHONE_PAC","ENABLE_TAB"
     ])
-    .sort(["CISNO","IDTYPE","ID"])
 )
 
 print("ORGANISATION FILE")
@@ -213,8 +213,7 @@ orgdly = (
     main_org.join(custinfo_org, on="CISNO", how="inner")
 )
 
-orgdly = orgdly.unique(subset=["CISNO","IDTYPE","ID"])
-orgdly = orgdly.sort("CISNO")
+orgdly = nodupkey(orgdly, ["CISNO","IDTYPE","ID"])
 
 print("FINAL ORGANISATION DATASET")
 print(orgdly.head(5))
@@ -224,8 +223,11 @@ print(orgdly.head(5))
 # Part 3 - Output                                 #
 #-------------------------------------------------#
 # SAVE RESULTS TO PARQUET                         #
+# (handed to CICISCOM in memory when run in the   #
+#  same process, persisted in the background)     #
 #-------------------------------------------------#
-indvdly.write_parquet("cis_internal/output/INDVDLY.parquet")
-orgdly.write_parquet("cis_internal/output/ORGDLY.parquet")
-indvdly.write_csv("cis_internal/output/INDVDLY.csv")
-orgdly.write_csv("cis_internal/output/ORGDLY.CSV")
+# SASFILE.INDVDLY / ORGDLY keep the SAS name CUSTNO for the customer key
+indvdly = decode_keys(indvdly, "CISNO").rename({"CISNO": "CUSTNO"})
+orgdly = decode_keys(orgdly, "CISNO").rename({"CISNO": "CUSTNO"})
+publish("INDVDLY", indvdly, "cis_internal/output/INDVDLY.parquet", "cis_internal/output/INDVDLY.csv")
+publish("ORGDLY", orgdly, "cis_internal/output/ORGDLY.parquet", "cis_internal/output/ORGDLY.CSV")
@@ -1,4 +1,5 @@
 import polars as pl
+from sasops import nodupkey
 
 # -----------------------------
 # READ SOURCE DATA (Equivalent to INFILE)
@@ -23,7 +24,7 @@ df_name = df_name.select([
 ])
 
 # Remove duplicates by CUSTNO
-df_name = df_name.unique(subset=["CUSTNO"])
+df_name = nodupkey(df_name, "CUSTNO")
 
 # Print first 5 rows (like PROC PRINT OBS=5)
 print("NAME:")
@@ -45,7 +46,7 @@ df_rmrk = df_rmrk.select([
 ])
 
 # Remove duplicates by CUSTNO
-df_rmrk = df_rmrk.unique(subset=["CUSTNO"])
+df_rmrk = nodupkey(df_rmrk, "CUSTNO")
 
 # Print first 5 rows
 print("REMARKS:")
@@ -11,6 +11,10 @@
 # Step 4 - remove duplicate
 
 import polars as pl
+from classify import classify
+from keys import decode_keys, encode_together
+from rlngraph import REVERSE, build
+from sortorder import order_by
 
 # =====================================================
 # STEP 0: READ ALL INPUT FILES (equivalent to SAS INFILE)
@@ -31,46 +35,40 @@ df_cc_orig = pl.read_parquet("path_to_CISRLCC.parquet")  # Replace with actual f
 # =====================================================
 # Map ACCTNOR to ACCTCODE
 df_ca = df_ca.with_columns(
-    pl.when(pl.col("ACCTNOR").is_in(["01","03","04","05","06","07"]))
-      .then("DP")
-      .when(pl.col("ACCTNOR").is_in(["02","08"]))
-      .then("LN")
-      .otherwise(None)
-      .alias("ACCTCODE")
+    classify("ACCTCODE").alias("ACCTCODE")
 )
 
 # Filter PRISEC = '901'
 df_ca = df_ca.filter(pl.col("PRISEC") == "901")
 
-# Sort by ACCTNOC
-df_ca = df_ca.sort("ACCTNOC")
-
 # Output equivalent to TEMPOUT
 df_ca_out = df_ca.select(["ACCTCODE", "ACCTNOC", "CUSTNO", "RLENCODE"])
 
+# customer numbers as UInt64 on both sides when they all fit (keys.py)
+df_cc_orig, df_ca_out = encode_together([(df_cc_orig, ["CUST1", "CUST2"]), (df_ca_out, "CUSTNO")])
+
 # =====================================================
 # STEP 2 - FLIP CC RELATIONSHIP
 # =====================================================
-# Flip CUST1/CODE1 with CUST2/CODE2
-df_cc_flipped = df_cc_orig.select([
-    pl.col("CUST2").alias("CUSTNO"),
-    pl.col("CODE2").alias("CODE1"),
-    pl.col("CUST1").alias("CUSTNO2"),
-    pl.col("CODE1").alias("CODE2")
-])
+# Flip CUST1/CODE1 with CUST2/CODE2: the reverse edges of the relationship
+# graph are the flipped rows (CUST2 -> CUST1, CODE1/CODE2 swapped)
+cc_graph = build(
+    df_cc_orig,
+    src="CUST1", dst="CUST2", attrs=("CODE1", "CODE2"),
+)
 
 # =====================================================
 # STEP 3 - MATCH RECORD WITH CC RELATIONSHIP
 # =====================================================
-# Ensure df_ca and df_cc_flipped have correct column names
-df_ca_sorted = df_ca_out.sort("CUSTNO")
-df_cc_sorted = df_cc_flipped.sort("CUSTNO")
-
-# Join on CUSTNO
-df_merge1 = df_ca_sorted.join(df_cc_sorted, on="CUSTNO", how="inner")
+# Inner match on CUSTNO: each CA row picks up the reverse-edge slice of its
+# customer (no join, the PROC SORTs before the MERGE are not needed)
+df_merge1 = cc_graph.expand(
+    df_ca_out, on="CUSTNO", direction=REVERSE, to="CUSTNO2"
+)
+df_merge1 = decode_keys(df_merge1, ["CUSTNO", "CUSTNO2"])
 
 # Sort by ACCTNOC, CUSTNO, CUSTNO2
-df_merge1 = df_merge1.sort(["ACCTNOC", "CUSTNO", "CUSTNO2"])
+df_merge1 = order_by(df_merge1, ["ACCTNOC", "CUSTNO", "CUSTNO2"])
 
 # Output equivalent to TEMPOUT
 df_merge_out = df_merge1.select([
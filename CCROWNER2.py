@@ -1,4 +1,5 @@
 import polars as pl
+from classify import classify
 
 # ======================================================
 # Read Input Parquet Files (all upfront)
@@ -16,12 +17,7 @@ ccrfile = pl.concat([ccrfile1, ccrfile2, ccrfile3])
 cis = (
     ccrfile
     .with_columns([
-        pl.when(pl.col("ACCTNOR").is_in(["01","03","04","05","06","07"]))
-          .then("DP")
-          .when(pl.col("ACCTNOR").is_in(["02","08"]))
-          .then("LN")
-          .otherwise(None)
-          .alias("ACCTCODE")
+        classify("ACCTCODE").alias("ACCTCODE")
     ])
     .filter(pl.col("PRISEC") == "901")
     .sort("ACCTNOC")
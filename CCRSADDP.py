@@ -1,4 +1,7 @@
 import polars as pl
+from layout import compile_member, find_layout
+from writer import write_put
+from sasops import nodupkey
 
 # -----------------------------------------------
 # Part 0: Read input datasets (like SAS INFILE)
@@ -15,7 +18,7 @@ aown = (
         (pl.col("O_APPL_CODE").is_in(["DP   "])) &
         (pl.col("ACCTNO") > "010000000000")
     )
-    .unique(subset=["ACCTNO"])  # PROC SORT NODUPKEY BY ACCTNO
+    .pipe(nodupkey, "ACCTNO")  # PROC SORT NODUPKEY BY ACCTNO
 )
 
 print("AOWN (first 5 rows):")
@@ -27,7 +30,7 @@ print(aown.head(5))
 # -----------------------------------------------
 dpaddr = (
     deposit.filter(pl.col("ACCTNO") > "010000000000")
-    .unique(subset=["ACCTNO"])  # PROC SORT NODUPKEY BY ACCTNO
+    .pipe(nodupkey, "ACCTNO")  # PROC SORT NODUPKEY BY ACCTNO
 )
 
 print("DEPOSIT ADDRESS (first 5 rows):")
@@ -49,30 +52,11 @@ print(merged.head(5))
 # Part 4: Write output to fixed-width file
 # Equivalent to DATA OUT and FILE OUTFILE in SAS
 # -----------------------------------------------
+# PUT layout of DATA OUT / FILE OUTFILE, compiled from the JCL member
+OUT_LAYOUT = find_layout(compile_member("CCRSADDP.txt"), dd="OUTFILE", kind="put")
+
 def write_fixed_width(df, output_file):
-    with open(output_file, "w") as f:
-        for row in df.iter_rows(named=True):
-            line = (
-                f"{row['O_APPL_CODE']:<5}"
-                f"{row['ACCTNO']:<20}"
-                f"{row['NA_LINE_TYP1']:<1}"
-                f"{row['ADD_NAME_1']:<40}"
-                f"{row['NA_LINE_TYP2']:<1}"
-                f"{row['ADD_NAME_2']:<40}"
-                f"{row['NA_LINE_TYP3']:<1}"
-                f"{row['ADD_NAME_3']:<40}"
-                f"{row['NA_LINE_TYP4']:<1}"
-                f"{row['ADD_NAME_4']:<40}"
-                f"{row['NA_LINE_TYP5']:<1}"
-                f"{row['ADD_NAME_5']:<40}"
-                f"{row['NA_LINE_TYP6']:<1}"
-                f"{row['ADD_NAME_6']:<40}"
-                f"{row['NA_LINE_TYP7']:<1}"
-                f"{row['ADD_NAME_7']:<40}"
-                f"{row['NA_LINE_TYP8']:<1}"
-                f"{row['ADD_NAME_8']:<40}"
-            )
-            f.write(line + "\n")
+    write_put(df, OUT_LAYOUT, output_file)
 
 write_fixed_width(merged, "DAILY.ADDRACC.out")
 
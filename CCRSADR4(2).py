@@ -1,4 +1,7 @@
 import polars as pl
+from gazetteer import state_of
+from exclusion import foreign_address, foreign_country
+from address import parse_address
 
 # ------------------------
 # Step 1: Read Parquet files
@@ -47,79 +50,18 @@ print(aele.head(5))
 # ------------------------
 addr_aele = addr.join(aele, on="ADDREF", how="inner")
 
-# concat address lines
-addr_aele = addr_aele.with_columns(
-    (pl.col("LINE1ADR") + pl.col("LINE2ADR") +
-     pl.col("LINE3ADR") + pl.col("LINE4ADR") +
-     pl.col("LINE5ADR")).alias("ADDRLINE")
-)
-
 # drop rows where CITY or ZIP is missing
 addr_aele = addr_aele.filter(
     (pl.col("CITY") == "") | (pl.col("ZIP") == "")
 )
 
-# remove invalid countries
-bad_countries = [
-    "SINGAPORE ","CANADA    ","SINGAPORE`","LONDON    ","AUS       ",
-    "AUSTRIA   ","BAHRAIN   ","BANGLADESH","BRUNEI DAR","CAMBODIA  ",
-    "CAN       ","CAYMAN ISL","CHINA     ","BRUNEI    ","INDONESIA ",
-    "DARUSSALAM","DENMARK   ","EMIRATES  ","ENGLAND   ","EUROPEAN  ",
-    "FRANCE    ","GERMANY   ","HONG KONG ","INDIA     ","IRAN (ISLA",
-    "IRELAND   ","JAPAN     ","KOREA REPU","MACAU     ","MAURITIUS ",
-    "MEXICO    ","MYANMAR   ","NEPAL     ","NETHERLAND","NEW ZEALAN",
-    "NEWZEALAND","NIGERIA   ","NORWAY    ","OMAN      ","PAKISTAN  ",
-    "PANAMA    ","PHILIPPINE","ROC       ","S ARABIA  ","SAMOA     ",
-    "SAUDI ARAB","SIGAPORE  ","SIMGAPORE ","SINGAPOREW","SINGPAORE ",
-    "SINGPORE  ","SINAGPORE ","SNGAPORE  ","SINGOPORE ","SPAIN     ",
-    "SRI LANKA ","SWAZILAND ","SWEDEN    ","SWITZERLAN","TAIWAN    ",
-    "TAIWAN,PRO","THAILAND  ","U KINGDOM ","U.K.      ","UNITED ARA",
-    "UK        ","UNITED KIN","UNITED STA","VIRGIN ISL","USA       ",
-    "PAPUA NEW ","AUSTRALIA "
-]
-addr_aele = addr_aele.filter(~pl.col("COUNTRY").is_in(bad_countries))
+# remove invalid countries (reference/exclusions.csv)
+addr_aele = addr_aele.filter(~foreign_country("COUNTRY"))
 
 # ------------------------
 # Step 5: Line checks (zip extraction from LINE2ADR..LINE5ADR)
 # ------------------------
-def extract_zip_city(df: pl.DataFrame, line: str):
-    return df.with_columns([
-        pl.when(
-            (pl.col(line).str.slice(0,5) > "00001") & 
-            (pl.col(line).str.slice(0,5) < "99998") &
-            (pl.col(line).str.slice(5,1) == " ")
-        )
-        .then(pl.col(line).str.slice(0,5))
-        .otherwise(pl.col("NEW_ZIP"))
-        .alias("NEW_ZIP"),
-        
-        pl.when(
-            (pl.col(line).str.slice(0,5) > "00001") & 
-            (pl.col(line).str.slice(0,5) < "99998") &
-            (pl.col(line).str.slice(5,1) == " ")
-        )
-        .then(pl.col(line).str.slice(6,25))
-        .otherwise(pl.col("NEW_CITY"))
-        .alias("NEW_CITY"),
-
-        pl.when(
-            (pl.col(line).str.slice(0,5) > "00001") & 
-            (pl.col(line).str.slice(0,5) < "99998") &
-            (pl.col(line).str.slice(5,1) == " ")
-        )
-        .then(pl.lit("MALAYSIA"))
-        .otherwise(pl.col("NEW_COUNTRY"))
-        .alias("NEW_COUNTRY"),
-    ])
-
-addr_aele = addr_aele.with_columns([
-    pl.lit("").alias("NEW_ZIP"),
-    pl.lit("").alias("NEW_CITY"),
-    pl.lit("").alias("NEW_COUNTRY")
-])
-
-for line in ["LINE2ADR","LINE3ADR","LINE4ADR","LINE5ADR"]:
-    addr_aele = extract_zip_city(addr_aele, line)
+addr_aele = parse_address(addr_aele)
 
 print("ADDR_AELE sample:")
 print(addr_aele.head(5))
@@ -127,41 +69,11 @@ print(addr_aele.head(5))
 # ------------------------
 # Step 6: Exclusion filters + assign STATEX
 # ------------------------
-exclude_strings = [
-    "SINGAPORE","HONG HONG","QATAR","TAMIL NADU","STAFFORDSHIRE",
-    "HANOI","VIETNAM","NEW ZEALAND","ENGLAND","AUCKLAND","SHANGHAI",
-    "DOHA QATAR","THAILAND","HONG KONG","SEOUL","#","NSW","NETHERLANDS",
-    "AUSTRALIA","S'PORE"
-]
-
-addraele1 = addr_aele.filter(
-    ~pl.any_horizontal([pl.col("ADDRLINE").str.contains(x) for x in exclude_strings])
-)
-
-# Assign STATEX by postal code
-def assign_state(zipcode: str) -> str:
-    if not zipcode.isdigit(): return None
-    z = int(zipcode)
-    if 79000 <= z <= 86999: return "JOH"
-    if 5000 <= z <= 9999: return "KED"
-    if 15000 <= z <= 18999: return "KEL"
-    if 75000 <= z <= 78999: return "MEL"
-    if 70000 <= z <= 73999: return "NEG"
-    if 25000 <= z <= 28999 or z == 69000: return "PAH"
-    if 10000 <= z <= 14999: return "PEN"
-    if 30000 <= z <= 36999 or 39000 <= z <= 39999: return "PRK"
-    if 1000 <= z <= 2999: return "PER"
-    if 88000 <= z <= 91999: return "SAB"
-    if 93000 <= z <= 98999: return "SAR"
-    if 40000 <= z <= 49999 or 63000 <= z <= 64999 or 68000 <= z <= 68199: return "SEL"
-    if 20000 <= z <= 24999: return "TER"
-    if 50000 <= z <= 60999: return "W P"
-    if 87000 <= z <= 87999: return "LAB"
-    if 62000 <= z <= 62999: return "PUT"
-    return None
+addraele1 = addr_aele.filter(~foreign_address())
 
+# Assign STATEX by postal code (reference/postcodes.csv, see gazetteer.py)
 addraele1 = addraele1.with_columns(
-    pl.col("NEW_ZIP").apply(assign_state).alias("STATEX")
+    state_of(pl.col("NEW_ZIP")).alias("STATEX")
 )
 
 print("ADDRAELE1 sample:")
@@ -1,12 +1,16 @@
 import polars as pl
+from catalog import register_path
+from dimensions import dimension
+from reader import load_input
+from sasops import nodupkey
 from datetime import datetime
 
 # -------------------------------------------------------------------
 # 1. Load parquet datasets (adjust paths to your converted files)
 # -------------------------------------------------------------------
 cisfile = pl.read_parquet("CUSTDAILY.parquet")
-indfile = pl.read_parquet("DAILYINDV.parquet")
-demofile = pl.read_parquet("DEMOCODE.parquet")
+indfile = load_input("INDVDLY")             # INDFILE = CCRNIDIC output
+register_path("DEMOCODE", "DEMOCODE.parquet")
 ctrldate = pl.read_parquet("datefile.parquet")
 
 # -------------------------------------------------------------------
@@ -42,7 +46,7 @@ cis = cis.with_columns([
 ])
 cis = cis.with_columns([
     pl.when(pl.col("CUSTOPEN") == "00002000000")
-      .then("20000101")
+      .then(pl.lit("20000101"))
       .otherwise(
           pl.col("CUSTOPEN").str.slice(4, 4) +  # year
           pl.col("CUSTOPEN").str.slice(0, 2) +  # month
@@ -58,50 +62,29 @@ cis = cis.with_columns([
 ])
 
 # Drop duplicates by CUSTNOX
-cis = cis.unique(subset=["CUSTNOX"])
+cis = nodupkey(cis, "CUSTNOX")
 
 # -------------------------------------------------------------------
 # 4. Process DEMOFILE (split by category)
 # -------------------------------------------------------------------
-sales = (
-    demofile.filter(pl.col("DEMOCATEGORY") == "SALES")
-    .select([
-        pl.col("DEMOCODE").alias("SALES"),
-        pl.col("CODEDESC").alias("SALDESC")
-    ])
-    .unique(subset=["SALES"])
-)
-
-restr = (
-    demofile.filter(pl.col("DEMOCATEGORY") == "RESTR")
-    .select([
-        pl.col("DEMOCODE").alias("RESTR"),
-        pl.col("CODEDESC").alias("RESDESC")
-    ])
-    .unique(subset=["RESTR"])
-)
-
-citzn = (
-    demofile.filter(pl.col("DEMOCATEGORY") == "CITZN")
-    .select([
-        pl.col("DEMOCODX").alias("CITZN"),
-        pl.col("CODEDESC").alias("CTZDESC")
-    ])
-    .unique(subset=["CITZN"])
-)
+# DEMOCODE -> description per category, loaded once per process
+sales = dimension("DEMOCODE", "DEMOCODE", "CODEDESC", where=pl.col("DEMOCATEGORY") == "SALES")
+restr = dimension("DEMOCODE", "DEMOCODE", "CODEDESC", where=pl.col("DEMOCATEGORY") == "RESTR")
+citzn = dimension("DEMOCODE", "DEMOCODX", "CODEDESC", where=pl.col("DEMOCATEGORY") == "CITZN")
 
 # -------------------------------------------------------------------
 # 5. Process INDFILE (INDVDLY)
 # -------------------------------------------------------------------
+# NODUPKEY BY CUSTNO DESCENDING LAST_UPDATE_DATE, then BY CUSTNOX: latest update per customer
 indv = (
-    indfile
+    nodupkey(indfile, ["CUSTNO", "LAST_UPDATE_DATE"], descending=[False, True])
     .filter(pl.col("CUSTNO").is_not_null())
     .with_columns([
         pl.col("CUSTNO").alias("CUSTNOX")
     ])
 )
 
-indv = indv.unique(subset=["CUSTNOX"], keep="last")  # keep last update
+indv = nodupkey(indv, "CUSTNOX")
 
 # -------------------------------------------------------------------
 # 6. Merge datasets step by step
@@ -116,9 +99,11 @@ mrgcis = (
     ])
 )
 
-mrgres = mrgcis.join(restr, on="RESTR", how="left")
-mrgsal = mrgres.join(sales, on="SALES", how="left")
-mrgctz = mrgsal.join(citzn, on="CITZN", how="left")
+mrgctz = mrgcis.with_columns(
+    restr.lookup("RESTR", rename={"CODEDESC": "RESDESC"})
+    + sales.lookup("SALES", rename={"CODEDESC": "SALDESC"})
+    + citzn.lookup("CITZN", rename={"CODEDESC": "CTZDESC"})
+)
 
 # -------------------------------------------------------------------
 # 7. Final Output (OUT2)
@@ -3,14 +3,20 @@
 # ===============================================================
 
 import polars as pl
+from catalog import register_path
+from dimensions import dimension
+from reader import load_input
 from datetime import datetime
+from layout import compile_member, find_layout
+from writer import write_put
+from sasops import nodupkey
 
 # -------------------------------------------------------------------
 # Part 0: Read all parquet files
 # -------------------------------------------------------------------
 cis = pl.read_parquet("CUSTDAILY.parquet")      # CISFILE.CUSTDLY
-indv = pl.read_parquet("DAILYINDV.parquet")     # INDFILE.INDVDLY
-demo = pl.read_parquet("DEMOCODE.parquet")      # DEMOFILE
+indv = load_input("INDVDLY")                   # INDFILE.INDVDLY (CCRNIDIC)
+register_path("DEMOCODE", "DEMOCODE.parquet")  # DEMOFILE
 
 # -------------------------------------------------------------------
 # Part 1: Date & Time Setup
@@ -85,47 +91,29 @@ cis = cis.with_columns(
 cis = cis.with_columns(pl.col("CUSTNO").alias("CUSTNOX"))
 
 # Remove duplicates by CUSTNOX
-cis = cis.unique(subset=["CUSTNOX"])
+cis = nodupkey(cis, "CUSTNOX")
 
 # -------------------------------------------------------------------
 # Part 3: DEMOFILE → SALES, RESTR, CITZN
 # -------------------------------------------------------------------
 
-# RESTR
-restr = (
-    demo.filter(pl.col("DEMOCATEGORY") == "RESTR")
-        .select(RESTR = pl.col("DEMOCODE"), RESDESC = pl.col("CODEDESC"))
-        .unique(subset=["RESTR"])
-)
-
-# SALES
-sales = (
-    demo.filter(pl.col("DEMOCATEGORY") == "SALES")
-        .select(SALES = pl.col("DEMOCODE"), SALDESC = pl.col("CODEDESC"))
-        .unique(subset=["SALES"])
-)
-
-# CITZN
-citzn = (
-    demo.filter(pl.col("DEMOCATEGORY") == "CITZN")
-        .select(CITZN = pl.col("DEMOCODX"), CTZDESC = pl.col("CODEDESC"))
-        .unique(subset=["CITZN"])
-)
+restr = dimension("DEMOCODE", "DEMOCODE", "CODEDESC", where=pl.col("DEMOCATEGORY") == "RESTR")
+sales = dimension("DEMOCODE", "DEMOCODE", "CODEDESC", where=pl.col("DEMOCATEGORY") == "SALES")
+citzn = dimension("DEMOCODE", "DEMOCODX", "CODEDESC", where=pl.col("DEMOCATEGORY") == "CITZN")
 
 # -------------------------------------------------------------------
 # Part 4: INDV – Individual Data
 # -------------------------------------------------------------------
 
 # Deduplicate by latest LAST_UPDATE_DATE
-indv = (
-    indv.sort(["CUSTNO", "LAST_UPDATE_DATE"], descending=[False, True])
-         .unique(subset=["CUSTNO"], keep="first")
-)
+# (NODUPKEY BY CUSTNO DESCENDING LAST_UPDATE_DATE, then BY CUSTNOX)
+indv = nodupkey(indv, ["CUSTNO", "LAST_UPDATE_DATE"], descending=[False, True])
 
 # Remove rows with empty CUSTNO
 indvx = indv.filter(pl.col("CUSTNO").str.strip_chars().is_not_null()).with_columns(
     pl.col("CUSTNO").alias("CUSTNOX")
 )
+indvx = nodupkey(indvx, "CUSTNOX")
 
 # -------------------------------------------------------------------
 # Part 5: Merge CIS + INDV + DEMO categories
@@ -142,14 +130,12 @@ mrgcis = mrgcis.with_columns(
     pl.col("CITIZENSHIP").alias("CITZN")
 )
 
-# Merge with RESTR
-mrgres = mrgcis.join(restr, on="RESTR", how="left")
-
-# Merge with SALES
-mrgsal = mrgres.join(sales, on="SALES", how="left")
-
-# Merge with CITZN
-mrgctz = mrgsal.join(citzn, on="CITZN", how="left")
+# Look up RESDESC, SALDESC, CTZDESC
+mrgctz = mrgcis.with_columns(
+    restr.lookup("RESTR", rename={"CODEDESC": "RESDESC"})
+    + sales.lookup("SALES", rename={"CODEDESC": "SALDESC"})
+    + citzn.lookup("CITZN", rename={"CODEDESC": "CTZDESC"})
+)
 
 # Sort by CUSTNOX
 mrgctz = mrgctz.sort("CUSTNOX")
@@ -158,29 +144,8 @@ mrgctz = mrgctz.sort("CUSTNOX")
 # Part 6: Output to fixed-width text file
 # -------------------------------------------------------------------
 
-def format_row(row: dict) -> str:
-    """
-    Format a single row as fixed-width string, following SAS PUT layout.
-    Only sample fields shown; add remaining fields as needed.
-    """
-    return (
-        f"{row['RUNTIMESTAMP']:<20}"
-        f"{row['CUSTNOX']:<20}"
-        f"{row['ADDREFX']:<11}"
-        f"{row['CUSTNAME']:<40}"
-        f"{row['PRIPHONEX']:<11}"
-        f"{row['SECPHONEX']:<11}"
-        f"{row['MOBILEPHX']:<11}"
-        f"{row['FAXX']:<11}"
-        f"{row.get('ALIASKEY',''):<3}"
-        f"{row.get('ALIAS',''):<20}"
-        f"{row.get('PROCESSTIME',''):<8}"
-        f"{row.get('CUSTSTAT',''):<1}"
-        f"{row.get('TAXCODE',''):<1}"
-        f"{row.get('TAXID',''):<9}"
-        # ... continue for all SAS PUT fields
-    )
+# Full SAS PUT layout of DATA OUT2 / FILE OUTFILE; columns not derived
+# above are written blank, as SAS does for uninitialised variables
+OUT_LAYOUT = find_layout(compile_member("CICISCOM.txt"), dd="OUTFILE", kind="put")
 
-with open("COMBINECUSTALL.txt", "w", encoding="utf-8") as f:
-    for row in mrgctz.to_dicts():
-        f.write(format_row(row) + "\n")
+write_put(mrgctz, OUT_LAYOUT, "COMBINECUSTALL.txt")
@@ -1,4 +1,5 @@
 import polars as pl
+from keys import key_text
 from datetime import datetime
 
 # -----------------------------------
@@ -60,11 +61,8 @@ print(MSIC.head())
 # -----------------------------------
 # Step 8: Process CYCLEFL (DPSTMT)
 # -----------------------------------
-def zero_pad_acct(acct):
-    return str(acct).zfill(11)
-
 DPSTMT = CYCLEFL.with_columns([
-    pl.col("ACCTNO").apply(zero_pad_acct).alias("ACCTNOC")
+    key_text("ACCTNO").alias("ACCTNOC")
 ])
 DPSTMT = DPSTMT.sort("ACCTNOC")
 print(DPSTMT.head())
@@ -79,7 +77,7 @@ print(DPPOST.head())
 # Step 10: Process DEPOSIT1
 # -----------------------------------
 DEPOSIT1 = DEPOFL.with_columns([
-    pl.col("ACCTNO").apply(zero_pad_acct).alias("ACCTNOC")
+    key_text("ACCTNO").alias("ACCTNOC")
 ]).sort("ACCTNOC")
 print(DEPOSIT1.head())
 
@@ -142,7 +140,7 @@ print(MERGEDP3.head(10))
 # Step 16: Merge loans
 # -----------------------------------
 LOANACCT = ACCTFILE.with_columns([
-    pl.col("ACCTNO").apply(zero_pad_acct).alias("ACCTNOC")
+    key_text("ACCTNO").alias("ACCTNOC")
 ])
 MERGELNBRCH = LOANACCT.join(PBBBRCH, on="ACCTBRCH", how="left")
 MERGELN = MERGEALL.join(MERGELNBRCH, on="ACCTNOC", how="inner").unique(subset=["ACCTNOC"])
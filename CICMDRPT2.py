@@ -2,6 +2,15 @@
 # Shared imports & base dir
 # ================================================================
 import polars as pl
+from catalog import register_path
+from classify import classify
+from dimensions import dimension
+from fanin import FanIn
+from keys import to_key, key_text, decode_keys, encode_together
+from profiler import checkpoint
+from reader import load_input
+from rlngraph import build, groups, exposure
+from writer import publish
 
 BASE = "parquet"  # <- adjust to your actual location
 
@@ -10,15 +19,15 @@ BASE = "parquet"  # <- adjust to your actual location
 # ================================================================
 ctrldate  = pl.read_parquet(f"{BASE}/CTRLDATE.parquet")
 aliasfl   = pl.read_parquet(f"{BASE}/ALIAS.parquet")
-brch      = pl.read_parquet(f"{BASE}/BRANCH.parquet")
-masco     = pl.read_parquet(f"{BASE}/MASCOFL.parquet")
-msic      = pl.read_parquet(f"{BASE}/MSICFL.parquet")
+register_path("BRANCH", f"{BASE}/BRANCH.parquet")
+register_path("MASCOFL", f"{BASE}/MASCOFL.parquet")
+register_path("MSICFL", f"{BASE}/MSICFL.parquet")
 dpstmt    = pl.read_parquet(f"{BASE}/CYCLEFL.parquet")
 dppost    = pl.read_parquet(f"{BASE}/POSTFL.parquet")
 deposit1  = pl.read_parquet(f"{BASE}/DEPOFL.parquet")
 cis       = pl.read_parquet(f"{BASE}/CISFILE_CUSTDLY.parquet")
-occupat   = pl.read_parquet(f"{BASE}/OCCUPAT.parquet")  # assuming occupation lookup table
-dptrbals_raw = pl.read_parquet(f"{BASE}/DPTRBALS.parquet")
+register_path("OCCUPAT", f"{BASE}/OCCUPAT.parquet")  # OCCUPFL = BANKCTRL.DEMOCODE, TYPE = 'OCCUP' rows
+dptrbals_raw = pl.scan_parquet(f"{BASE}/DPTRBALS.parquet")  # lazy: REPTNO filter + final select pushed into the scan
 dpstmt = pl.read_parquet(f"{BASE}/CYCLEFL.parquet")
 dppost = pl.read_parquet(f"{BASE}/POSTFL.parquet")
 deposit1 = pl.read_parquet(f"{BASE}/DEPOFL.parquet")
@@ -49,6 +58,7 @@ LOADDATE = (
 )
 print("\n=== Part 1: CTRLDATE (LOADDATE) ===")
 print("LOADDATE:", LOADDATA)
+checkpoint("Part 1 CTRLDATE")
 
 # ================================================================
 # Part 2: ALIASFL
@@ -59,53 +69,22 @@ aliasfl = (
         pl.col("ALIASKEY").cast(pl.Utf8),
         pl.col("ALIAS").cast(pl.Utf8),
     )
-    .sort(["ALIASKEY", "ALIAS"])
 )
 print("\n=== Part 2: ALIASFL ===")
 print(aliasfl.head(5))
+checkpoint("Part 2 ALIASFL", aliasfl)
 
 # ================================================================
-# Part 3: BRANCH
+# Part 3-5: BRANCH, MASCO, MSIC (+ OCCUP) -> code to description,
+# loaded once per process and looked up without a join
 # ================================================================
-brch = (
-    brch
-    .select(
-        pl.col("ACCTBRCH").cast(pl.Utf8),
-        pl.col("BRANCH_ABBR").cast(pl.Utf8),
-    )
-    .unique(subset=["ACCTBRCH"], keep="first")
-    .sort("ACCTBRCH")
-)
-print("\n=== Part 3: BRANCH ===")
-print(brch.head(5))
-
-# ================================================================
-# Part 4: MASCO
-# ================================================================
-masco = (
-    masco
-    .select(
-        pl.col("MASCO2008").cast(pl.Utf8),
-        pl.col("MASCODESC").cast(pl.Utf8),
-    )
-    .sort("MASCO2008")
-)
-print("\n=== Part 4: MASCO ===")
-print(masco.head(5))
-
-# ================================================================
-# Part 5: MSIC
-# ================================================================
-msic = (
-    msic
-    .select(
-        pl.col("MSICCODE").cast(pl.Utf8),
-        pl.col("MSICDESC").cast(pl.Utf8),
-    )
-    .sort("MSICCODE")
-)
-print("\n=== Part 5: MSIC ===")
-print(msic.head(5))
+brch = dimension("BRANCH", "ACCTBRCH", "BRANCH_ABBR")
+masco = dimension("MASCOFL", "MASCO2008", "MASCODESC")
+msic = dimension("MSICFL", "MSICCODE", "MSICDESC")
+# OCCUPAT keeps its own columns (INPUT TYPE $5. DEMOCODE $3. DEMODESC $60.);
+# the report needs DEMODESC from it, so lookup() raises if the table lacks it
+occupat = dimension("OCCUPAT", "DEMOCODE")
+print(f"\n=== Part 3-5: BRANCH {len(brch)} / MASCO {len(masco)} / MSIC {len(msic)} codes ===")
 
 # ================================================================
 # Part 6: DPSTMT (CYCLEFL)
@@ -114,7 +93,7 @@ dpstmt = (
     dpstmt
     .with_columns(
         pl.col("ACCTNO").cast(pl.Int64),
-        pl.col("ACCTNO").cast(pl.Utf8).str.zfill(11).alias("ACCTNOC")
+        to_key(pl.col("ACCTNO"), numeric=True).alias("ACCTNOC")
     )
     .select(
         "ACCTNOC",
@@ -128,10 +107,10 @@ dpstmt = (
         pl.col("PREV_CYC_CR").cast(pl.Int64, strict=False),
         pl.col("PREV_AMT_CR").cast(pl.Float64, strict=False),
     )
-    .sort("ACCTNOC")
 )
 print("\n=== Part 6: DPSTMT ===")
 print(dpstmt.head(5))
+checkpoint("Part 6 DPSTMT", dpstmt)
 
 # ================================================================
 # Part 7: DPPOST (POSTFL)
@@ -139,14 +118,14 @@ print(dpstmt.head(5))
 dppost = (
     dppost
     .select(
-        pl.col("ACCTNOC").cast(pl.Utf8),
+        to_key(pl.col("ACCTNOC").cast(pl.Utf8)).alias("ACCTNOC"),
         pl.col("ACCT_PST_IND").cast(pl.Utf8),
         pl.col("ACCT_PST_REASON").cast(pl.Utf8),
     )
-    .sort("ACCTNOC")
 )
 print("\n=== Part 7: DPPOST ===")
 print(dppost.head(5))
+checkpoint("Part 7 DPPOST", dppost)
 
 # ================================================================
 # Part 8: DEPOSIT1 (DEPOFL)
@@ -155,7 +134,7 @@ deposit1 = (
     deposit1
     .with_columns(
         pl.col("ACCTNO").cast(pl.Int64),
-        pl.col("ACCTNO").cast(pl.Utf8).str.zfill(11).alias("ACCTNOC")
+        to_key(pl.col("ACCTNO"), numeric=True).alias("ACCTNOC")
     )
     .select(
         "ACCTNOC",
@@ -173,10 +152,10 @@ deposit1 = (
         pl.col("SOURCE_3").cast(pl.Utf8),
         pl.col("TOT_HOLD").cast(pl.Utf8),
     )
-    .sort("ACCTNOC")
 )
 print("\n=== Part 8: DEPOSIT1 ===")
 print(deposit1.head(5))
+checkpoint("Part 8 DEPOSIT1", deposit1)
 
 # ================================================================
 # Part 9: CIS + merges → mergeall1 (including OCCUP merge)
@@ -190,24 +169,20 @@ cis = (
         pl.all(),
         pl.col("DEMOCODE")
     ])
-    .sort(["ALIASKEY","ALIAS"])
 )
 
 # Step 1: Merge aliasfl with CIS on ALIASKEY + ALIAS
 mergeals = aliasfl.join(cis, on=["ALIASKEY","ALIAS"], how="inner")
 
-# Step 2: Merge OCCUP code with occupation lookup table
-mergeocc = mergeals.join(occupat, on="DEMOCODE", how="left")
-
-# Step 3: Merge MASCO
-mergemsc = mergeocc.join(masco, on="MASCO2008", how="left")
-
-# Step 4: Merge MSIC
-mergeall1 = mergemsc.join(msic, on="MSICCODE", how="left").sort("ALIAS")
+# Step 2-4: OCCUP, MASCO, MSIC descriptions
+mergeall1 = mergeals.with_columns(
+    occupat.lookup("DEMOCODE", ["DEMODESC"]) + masco.lookup("MASCO2008") + msic.lookup("MSICCODE")
+)
 
 # Preview
 print("\n=== Part 9: MERGEALL1 ===")
 print(mergeall1.head(5))
+checkpoint("Part 9 MERGEALL1", mergeall1)
 
 # ================================================================
 # Part 10: SAFEBOX2 + merge with MERGEALL1 (SDB flags)
@@ -219,7 +194,7 @@ dptrbals = (
     )
     .with_columns(
         pl.col("ACCTNO").cast(pl.Int64),
-        pl.col("ACCTNO").cast(pl.Utf8).str.zfill(11).alias("ACCTNOC"),
+        to_key(pl.col("ACCTNO"), numeric=True).alias("ACCTNOC"),
         pl.col("ACCTBRCH1").cast(pl.Int64).alias("ACCTBRCH1_i"),
         pl.col("ACCTBRCH1").cast(pl.Utf8).str.zfill(3).alias("ACCTBRCH"),
         pl.col("PRODTYPE").cast(pl.Int64),
@@ -229,42 +204,8 @@ dptrbals = (
         (pl.col("LEDGERBAL1").cast(pl.Float64, strict=False) / 100.0).alias("LEDGERBAL"),
         pl.col("ACCTNAME").cast(pl.Utf8).alias("ACCTNAME40"),
     )
-    .with_columns([
-        pl.when((pl.col("ACCTNOC") > "03000000000") & (pl.col("ACCTNOC") < "03999999999"))
-          .then(pl.lit("CA"))
-          .when((pl.col("ACCTNOC") > "06200000000") & (pl.col("ACCTNOC") < "06299999999"))
-          .then(pl.lit("CA"))
-          .when((pl.col("ACCTNOC") > "06710000000") & (pl.col("ACCTNOC") < "06719999999"))
-          .then(pl.lit("CA"))
-          .when((pl.col("ACCTNOC") > "01000000000") & (pl.col("ACCTNOC") < "01999999999"))
-          .then(pl.lit("FD"))
-          .when((pl.col("ACCTNOC") > "07000000000") & (pl.col("ACCTNOC") < "07999999999"))
-          .then(pl.lit("FD"))
-          .when((pl.col("ACCTNOC") > "04000000000") & (pl.col("ACCTNOC") < "04999999999"))
-          .then(pl.lit("SA"))
-          .when((pl.col("ACCTNOC") > "05000000000") & (pl.col("ACCTNOC") < "05999999999"))
-          .then(pl.lit("SA"))
-          .when((pl.col("ACCTNOC") > "06000000000") & (pl.col("ACCTNOC") < "06199999999"))
-          .then(pl.lit("SA"))
-          .when((pl.col("ACCTNOC") > "06300000000") & (pl.col("ACCTNOC") < "06709999999"))
-          .then(pl.lit("SA"))
-          .when((pl.col("ACCTNOC") > "06720000000") & (pl.col("ACCTNOC") < "06999999999"))
-          .then(pl.lit("SA"))
-          .otherwise(pl.col("APPL_CODE").cast(pl.Utf8, strict=False))
-          .alias("APPL_CODE")
-    ])
     .with_columns(
-        pl.when(pl.col("PRODTY").is_in(
-            ["371","350","351","352","353","354","355","356","357","358","359","360","361","362"]
-        )).then(pl.lit("FCYFD"))
-         .when(pl.col("PRODTY").is_in(
-            ["400","401","402","403","404","405","406","407","408","409","410","411","413","414",
-             "420","421","422","423","424","425","426","427","428","429","430","431","432","433",
-             "434","440","441","442","443","444","450","451","452","453","454","460","461","473",
-             "474","475","476"]
-        )).then(pl.lit("FCYCA"))
-         .otherwise(pl.col("APPL_CODE"))
-         .alias("APPL_CODE")
+        classify("DP_APPL_CODE", pl.col("APPL_CODE").cast(pl.Utf8, strict=False)).alias("APPL_CODE")
     )
     .filter(pl.col("PURPOSECD").is_not_null() & (pl.col("PURPOSECD") != ""))
     .with_columns(pl.col("PURPOSECD").alias("ACCT_TYPE"))
@@ -300,11 +241,12 @@ dptrbals = (
         "OPENIND","COSTCTR","POSTIND","APPL_CODE","ACCT_TYPE","ACCTSTATUS",
         "DATEOPEN","DATECLSE"
     ])
-    .sort("ACCTBRCH")
+    .collect()
 )
 
 print("\n=== Part 10: DPTRBALS preview ===")
 print(dptrbals.head(5))
+checkpoint("Part 10 DPTRBALS", dptrbals)
 
 # ================================================================
 # Part 11: DPTRBALS processing + merges
@@ -313,7 +255,7 @@ dpstmt = (
     dpstmt
     .with_columns(
         pl.col("ACCTNO").cast(pl.Int64),
-        pl.col("ACCTNO").cast(pl.Utf8).str.zfill(11).alias("ACCTNOC")
+        to_key(pl.col("ACCTNO"), numeric=True).alias("ACCTNOC")
     )
     .select(
         "ACCTNOC",
@@ -327,24 +269,22 @@ dpstmt = (
         pl.col("PREV_CYC_CR").cast(pl.Int64, strict=False),
         pl.col("PREV_AMT_CR").cast(pl.Float64, strict=False),
     )
-    .sort("ACCTNOC")
 )
 
 dppost = (
     dppost
     .select(
-        pl.col("ACCTNOC").cast(pl.Utf8),
+        to_key(pl.col("ACCTNOC").cast(pl.Utf8)).alias("ACCTNOC"),
         pl.col("ACCT_PST_IND").cast(pl.Utf8),
         pl.col("ACCT_PST_REASON").cast(pl.Utf8),
     )
-    .sort("ACCTNOC")
 )
 
 deposit1 = (
     deposit1
     .with_columns(
         pl.col("ACCTNO").cast(pl.Int64),
-        pl.col("ACCTNO").cast(pl.Utf8).str.zfill(11).alias("ACCTNOC")
+        to_key(pl.col("ACCTNO"), numeric=True).alias("ACCTNOC")
     )
     .select(
         "ACCTNOC",
@@ -362,7 +302,6 @@ deposit1 = (
         pl.col("SOURCE_3").cast(pl.Utf8),
         pl.col("TOT_HOLD").cast(pl.Utf8),
     )
-    .sort("ACCTNOC")
 )
 
 print("\n=== Part 11: DPSTMT preview ===")
@@ -373,6 +312,7 @@ print(dppost.head(5))
 
 print("\n=== Part 11: DEPOSIT1 preview ===")
 print(deposit1.head(5))
+checkpoint("Part 11 DPSTMT/DPPOST/DEPOSIT1", deposit1)
 
 # ================================================================
 # Part 12: Loan accounts processing + merge with MERGEALL
@@ -381,20 +321,15 @@ loanacct = (
     loanacct_raw
     .with_columns(
         pl.col("ACCTNO").cast(pl.Int64),
-        pl.col("ACCTNO").cast(pl.Utf8).str.zfill(11).alias("ACCTNOC"),
+        to_key(pl.col("ACCTNO"), numeric=True).alias("ACCTNOC"),
         pl.col("NOTENO").cast(pl.Int64),
         pl.col("NOTENO").cast(pl.Utf8).str.zfill(5).alias("NOTENOC"),
     )
     .with_columns(
-        (pl.col("ACCTNOC") + pl.lit("-") + pl.col("NOTENOC")).alias("ACCTNOTE"),
+        (key_text("ACCTNOC") + pl.lit("-") + pl.col("NOTENOC")).alias("ACCTNOTE"),
         pl.col("ACCTNAME").cast(pl.Utf8).alias("ACCTNAME40"),
         pl.col("ORGTYPE").cast(pl.Utf8).alias("ACCT_TYPE"),
-        pl.when((pl.col("ACCTNOC") > "02000000000") & (pl.col("ACCTNOC") < "02999999999"))
-          .then(pl.lit("LN"))
-         .when((pl.col("ACCTNOC") > "08000000000") & (pl.col("ACCTNOC") < "08999999999"))
-          .then(pl.lit("HP"))
-         .otherwise(pl.lit(None))
-         .alias("APPL_CODE"),
+        classify("LN_APPL_CODE").alias("APPL_CODE"),
         pl.when((pl.col("COSTCENTER") >= 3000) & (pl.col("COSTCENTER") <= 3999))
           .then(pl.lit("I")).otherwise(pl.lit("C")).alias("BANKINDC"),
         pl.col("COSTCENTER").cast(pl.Int64).fill_null(0).alias("COSTCENTER_i")
@@ -419,36 +354,23 @@ loanacct = (
         (pl.col("NOTECURBAL").cast(pl.Float64, strict=False) / 100.0).alias("LEDGERBAL"),
     )
     .with_columns(
-        pl.when((pl.col("NPLINDC") == "3") | (pl.col("ARREARDAY") > 92))
-          .then(pl.lit("NPL"))
-         .when((pl.col("ARREARDAY") > 1) & (pl.col("ARREARDAY") < 92))
-          .then(pl.lit("ACCOUNT IN ARREARS"))
-         .when(pl.col("NOTEPAID") == "P")
-          .then(pl.lit("PAID-OFF"))
-         .otherwise(pl.lit(""))
-         .alias("ACCTSTATUS")
-    )
-    .with_columns(
-        pl.when((pl.col("NOTECURBAL") > 0) & ((pl.col("ACCTSTATUS") == "") | pl.col("ACCTSTATUS").is_null()))
-          .then(pl.lit("ACTIVE"))
-         .otherwise(pl.col("ACCTSTATUS"))
-         .alias("ACCTSTATUS")
+        classify(
+            "LN_ACCTSTATUS",
+            pl.when(pl.col("NOTECURBAL") > 0).then(pl.lit("ACTIVE")).otherwise(pl.lit("")),
+        ).alias("ACCTSTATUS")
     )
     .select([
         "ACCTNOC","ACCTNAME40","ACCT_TYPE","APPL_CODE","BANKINDC",
         "COSTCTR1","ACCTBRCH","DATEOPEN","DATECLSE","LEDGERBAL","ACCTSTATUS"
     ])
-    .sort("ACCTBRCH")
 )
 
 # Join BRCH → MERGELNBRCH
-mergelnbrch = loanacct.join(brch, on="ACCTBRCH", how="left").sort("ACCTNOC")
-
-# MERGEALL + MERGELNBRCH on ACCTNOC (inner like SAS IF C AND D) → MERGELN
-mergeln = mergeall.join(mergelnbrch, on="ACCTNOC", how="inner").unique(subset=["ACCTNOC"], keep="first")
+mergelnbrch = loanacct.with_columns(brch.lookup("ACCTBRCH"))
 
-print("\n=== Part 12: Loan Accounts preview (after merge) ===")
-print(mergeln.head(5))
+print("\n=== Part 12: Loan Accounts preview ===")
+print(mergelnbrch.head(5))
+checkpoint("Part 12 Loan accounts", mergelnbrch)
 
 # ================================================================
 # Part 13: SAFEBOX processing + merge with MERGEALL
@@ -459,7 +381,7 @@ safebox = (
         pl.col("CUSTNO").cast(pl.Utf8),
         pl.col("ACCTNAME40").cast(pl.Utf8),
         pl.col("BRANCH_ABBR").cast(pl.Utf8),
-        pl.col("ACCTNOC").cast(pl.Utf8),
+        to_key(pl.col("ACCTNOC").cast(pl.Utf8)).alias("ACCTNOC"),
         pl.col("BANKINDC").cast(pl.Utf8),
         pl.col("ACCTSTATUS").cast(pl.Utf8),
     )
@@ -468,14 +390,11 @@ safebox = (
         pl.lit("3").alias("CATEGORY"),
         pl.lit("SDB").alias("APPL_CODE"),
     )
-    .sort("ACCTNOC")
 )
 
-# Inner join SAFEBOX with mergeall, keep unique ACCTNOC
-mergesdb = mergeall.join(safebox, on="ACCTNOC", how="inner").unique(subset=["ACCTNOC"], keep="first")
-
-print("\n=== Part 13: SAFEBOX Merge preview ===")
-print(mergesdb.head(5))
+print("\n=== Part 13: SAFEBOX preview ===")
+print(safebox.head(5))
+checkpoint("Part 13 SAFEBOX", safebox)
 
 
 # ================================================================
@@ -485,19 +404,16 @@ unicd = (
     unicd_raw
     .select(
         pl.col("BRANCH_ABBR").cast(pl.Utf8),
-        pl.col("ACCTNOC").cast(pl.Utf8),
+        to_key(pl.col("ACCTNOC").cast(pl.Utf8)).alias("ACCTNOC"),
         pl.col("ACCTSTATUS").cast(pl.Utf8),
         pl.col("DATEOPEN").cast(pl.Utf8),
         pl.col("DATECLSE").cast(pl.Utf8),
     )
-    .sort("ACCTNOC")
 )
 
-# Inner join UNICARD with mergeall, keep unique ACCTNOC
-mergeuni = mergeall.join(unicd, on="ACCTNOC", how="inner").unique(subset=["ACCTNOC"], keep="first")
-
-print("\n=== Part 14: UNICARD Merge preview ===")
-print(mergeuni.head(5))
+print("\n=== Part 14: UNICARD preview ===")
+print(unicd.head(5))
+checkpoint("Part 14 UNICARD", unicd)
 
 # ================================================================
 # Part 15: COMCARD processing + merge with MERGEALL
@@ -506,35 +422,44 @@ comcd = (
     comcd_raw
     .select(
         pl.col("BRANCH_ABBR").cast(pl.Utf8),
-        pl.col("ACCTNOC").cast(pl.Utf8),
+        to_key(pl.col("ACCTNOC").cast(pl.Utf8)).alias("ACCTNOC"),
         pl.col("ACCTSTATUS").cast(pl.Utf8),
         pl.col("DATEOPEN").cast(pl.Utf8),
         pl.col("DATECLSE").cast(pl.Utf8),
     )
-    .sort("ACCTNOC")
 )
 
-# Inner join COMCARD with mergeall, keep unique ACCTNOC
-mergecom = mergeall.join(comcd, on="ACCTNOC", how="inner").unique(subset=["ACCTNOC"], keep="first")
+print("\n=== Part 15: COMCARD preview ===")
+print(comcd.head(5))
+checkpoint("Part 15 COMCARD", comcd)
+
+# ================================================================
+# Part 15.1: Match every account source with MERGEALL
+# ================================================================
+# MERGE MERGEALL(IN=C) <source>(IN=D); BY ACCTNOC; IF C AND D; then
+# PROC SORT NODUPKEY BY ACCTNOC, for all sources against one MERGEALL
+# key index, evaluated together
+ACCOUNTS = FanIn(mergeall, "ACCTNOC", [mergelnbrch, safebox, unicd, comcd])
+mergeln, mergesdb, mergeuni, mergecom = ACCOUNTS.matches
 
-print("\n=== Part 15: COMCARD Merge preview ===")
-print(mergecom.head(5))
+print("\n=== Part 15.1: Loan / SAFEBOX / UNICARD / COMCARD matches ===")
+for name, merged in [("MERGELN", mergeln), ("MERGESDB", mergesdb), ("MERGEUNI", mergeuni), ("MERGECOM", mergecom)]:
+    print(name)
+    print(merged.head(5))
+checkpoint("Part 15.1 MERGEALL probes", mergecom)
 
 # ================================================================
 # Part 16: Combine all merged dataframes into final output
 # ================================================================
 
-# Union rows (like SAS SET MERGEDP MERGELN MERGESDB MERGEUNI MERGECOM)
-# diagonal_relaxed allows different schemas
-output_df = pl.concat(
-    [df for df in [mergedp, mergeln, mergesdb, mergeuni, mergecom] if 'ACCTNOC' in df.columns],
-    how="diagonal_relaxed"
-)
+# Union rows (like SAS SET MERGEDP MERGELN MERGESDB MERGEUNI MERGECOM),
+# columns a source lacks are null
+output_df = ACCOUNTS.stream([mergedp, mergeln, mergesdb, mergeuni, mergecom])
 
 # Select/rename to final layout (as per positional PUT in SAS)
 output_df = output_df.select([
     pl.col("CUSTNO").cast(pl.Utf8),
-    pl.col("ACCTNOC").cast(pl.Utf8),
+    key_text("ACCTNOC"),
     pl.col("OCCUP").cast(pl.Utf8, strict=False),
     pl.col("MASCO2008").cast(pl.Utf8, strict=False),
     pl.col("ALIASKEY").cast(pl.Utf8, strict=False),
@@ -559,14 +484,12 @@ output_df = output_df.select([
 
 print("\n=== Part 16: Combined output preview ===")
 print(output_df.head(5))
+checkpoint("Part 16 Combined output", output_df)
 
 # ================================================================
 # Part 17.1: Generate semicolon-delimited customer report
 # ================================================================
-report_base = pl.concat(
-    [df for df in [mergedp3, mergeln, mergesdb, mergeuni, mergecom] if 'ACCTNOC' in df.columns],
-    how="diagonal_relaxed"
-)
+report_base = ACCOUNTS.stream([mergedp3, mergeln, mergesdb, mergeuni, mergecom])
 
 report_df = (
     report_base
@@ -618,7 +541,7 @@ report_df = (
         pl.col("ROW_NO"),
         pl.col("ALIASKEY"), pl.col("ALIAS"), pl.col("CUSTNAME"),
         pl.col("CUSTNO"), pl.col("DEMODESC"), pl.col("MASCODESC"),
-        pl.col("SICCODE"), pl.col("MSICDESC"), pl.col("ACCTNOC"),
+        pl.col("SICCODE"), pl.col("MSICDESC"), key_text("ACCTNOC"),
         pl.col("BRANCH_ABBR"), pl.col("ACCTSTATUS"),
         pl.col("DATEOPEN"), pl.col("DATECLSE"),
         pl.col("SDBIND"), pl.col("SDBBRH"),
@@ -659,12 +582,13 @@ with open("CMDREPORT.txt", "w", encoding="utf-8") as f:
         f.write(line + "\n")
     for row in report_body.iter_rows():
         f.write(";".join("" if v is None else str(v) for v in row) + "\n")
+checkpoint("Part 17.1 CMDREPORT", report_body)
 
 # ================================================================
 # Part 17.2: Generate semicolon-delimited customer report
 # ================================================================
-# Combine datasets vertically (like SET in SAS)
-df = pl.concat([mergedp3, mergeln, mergesdb, mergeuni, mergecom])
+# Combine datasets vertically (like SET in SAS), ACCTNOC back to Z11. text
+df = decode_keys(ACCOUNTS.stream([mergedp3, mergeln, mergesdb, mergeuni, mergecom]), "ACCTNOC")
 
 # -----------------------------
 #  Replace blanks with 'NIL'
@@ -755,3 +679,31 @@ report_columns = [c for c in report_columns if c in df.columns]
 df.select(['NO'] + report_columns).write_csv(
     "PBB_REPORT.csv", sep=';', float_format="%.2f"
 )
+checkpoint("Part 17.2 PBB_REPORT", df)
+
+# ================================================================
+# Part 18: Related customer groups and their LEDGERBAL exposure
+# ================================================================
+# GROUPID = lowest CUSTNO reachable through CC relationships (RLNSHIP);
+# set GROUP_CODES to a list of relationship codes to narrow the groups, or
+# GROUP_MAX_HOPS to split them into groups no wider than that many
+# relationships from their lowest CUSTNO (rlngraph.py)
+GROUP_CODES = None
+GROUP_MAX_HOPS = None
+
+rlnship, accounts = encode_together([
+    (load_input("RLNSHIP", columns=["CUSTNO1", "CUSTNO2", "CODE1", "CODE2", "EFFDATE"]),
+     ["CUSTNO1", "CUSTNO2"]),
+    (output_df.select("CUSTNO", "ACCTNOC", "LEDGERBAL"), "CUSTNO"),
+])
+cc_graph = build(rlnship)
+custgroup, grouptotals = exposure(
+    groups(cc_graph, codes=GROUP_CODES, max_hops=GROUP_MAX_HOPS),
+    accounts,
+)
+custgroup = decode_keys(custgroup, ["CUSTNO", "GROUPID"])
+grouptotals = decode_keys(grouptotals, "GROUPID")
+
+publish("CUSTGROUP", custgroup, "CUSTGROUP.parquet")
+publish("CUSTGROUP_TOTALS", grouptotals, "CUSTGROUP_TOTALS.parquet")
+checkpoint("Part 18 CUSTGROUP", custgroup)
@@ -0,0 +1,50 @@
+import polars as pl
+
+#-------------------------------------------------------------------#
+# Zip / city pickup from free-text address lines                    #
+#-------------------------------------------------------------------#
+# CCRSADR4 takes the zip and city from an address line that starts  #
+# with a 5-character postcode followed by a blank:                  #
+#     '00001' < SUBSTR(LINE,1,5) < '99998'  AND SUBSTR(LINE,6,1)=' ' #
+#     AND none of the 5 characters is ' ' , & / -                   #
+# NEW_ZIP = SUBSTR(LINE,1,5), NEW_CITY = SUBSTR(LINE,7,25) and      #
+# NEW_COUNTRY = 'MALAYSIA' then come from that line.                #
+# parse_address(df) tests every line once (one regex + a range     #
+# compare) and picks the line with a coalesce, so the frame is      #
+# rewritten twice instead of three times per line.                  #
+# By default the last qualifying line wins, as in the ports; the    #
+# JCL's IF / ELSE IF chain keeps the first (first=True).            #
+#-------------------------------------------------------------------#
+
+ZIP_LINES = ["LINE2ADR", "LINE3ADR", "LINE4ADR", "LINE5ADR"]
+
+
+def has_zip(line: str) -> pl.Expr:
+    """The line opens with a postcode (SAS pads short lines with blanks)."""
+    col = pl.col(line)
+    head = col.str.head(5)
+    return (
+        col.str.contains(r"^[^ ,&/\-]{5}( |$)")
+        & (head > "00001") & (head < "99998")
+    ).fill_null(False)
+
+
+def parse_address(frame, lines=ZIP_LINES, first: bool = False):
+    """Add NEW_ZIP, NEW_CITY, NEW_COUNTRY; blank when no line carries a postcode."""
+    order = list(lines) if first else list(reversed(lines))
+    hits = [f"_ZIP_HIT{i}" for i in range(len(order))]
+    pick = lambda start, width: pl.coalesce([
+        pl.when(pl.col(hit)).then(pl.col(line).str.slice(start, width))
+        for hit, line in zip(hits, order)
+    ])
+    found = pl.any_horizontal(hits)
+    return (
+        frame
+        .with_columns([has_zip(line).alias(hit) for hit, line in zip(hits, order)])
+        .with_columns([
+            pick(0, 5).fill_null("").alias("NEW_ZIP"),
+            pl.when(found).then(pick(6, 25).fill_null("")).otherwise(pl.lit("")).alias("NEW_CITY"),
+            pl.when(found).then(pl.lit("MALAYSIA")).otherwise(pl.lit("")).alias("NEW_COUNTRY"),
+        ])
+        .drop(hits)
+    )
@@ -0,0 +1,86 @@
+import os
+import polars as pl
+from collections import OrderedDict
+
+#-------------------------------------------------------------------#
+# Process-wide dataset catalog                                      #
+#-------------------------------------------------------------------#
+# PATHS maps DD-style names (e.g. "CCCODE", "RLEN#CC") to physical  #
+# files, so jobs can use the JCL names instead of hard-coded paths. #
+# TABLES caches decoded inputs keyed by path + mtime + size, so a   #
+# second read of an unchanged file in the same process is free.     #
+# The cache is bounded by CIS_CACHE_BYTES (default 2 GiB) and       #
+# evicts least-recently-used tables first.                          #
+# HANDOFF holds frames published by an upstream job in the same     #
+# process (writer.publish); load_input serves those from memory.    #
+#-------------------------------------------------------------------#
+
+CACHE_BYTES = int(os.environ.get("CIS_CACHE_BYTES", 2 * 1024 ** 3))
+
+# DD / alias name -> physical path
+PATHS = {}
+
+# dataset name -> DataFrame published by an upstream job in this process
+HANDOFF = {}
+
+
+def register_path(name: str, path: str):
+    PATHS[name] = path
+
+
+def file_key(path: str) -> tuple:
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+class TableCache:
+    """Byte-bounded LRU of decoded DataFrames."""
+
+    def __init__(self, max_bytes: int = CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.tables = OrderedDict()     # (file_key, columns) -> (df, nbytes)
+        self.hits = self.misses = 0
+
+    def get(self, path: str, columns=None, loader=None) -> pl.DataFrame:
+        """Cached read of `path`; loader(columns) decodes it on a miss.
+
+        A projection is served from the cached full table when there is one.
+        """
+        fkey = file_key(path)
+        cols = tuple(columns) if columns is not None else None
+
+        for key in ((fkey, cols), (fkey, None)):
+            if key in self.tables:
+                self.tables.move_to_end(key)
+                self.hits += 1
+                df = self.tables[key][0]
+                return df if key[1] == cols else df.select(list(cols))
+
+        self.misses += 1
+        df = loader(columns)
+        self.put((fkey, cols), df)
+        return df
+
+    def put(self, key, df: pl.DataFrame):
+        nbytes = df.estimated_size()
+        if nbytes > self.max_bytes:
+            return
+        self.drop_stale(key[0])
+        self.tables[key] = (df, nbytes)
+        self.used += nbytes
+        while self.used > self.max_bytes:
+            _, (_, freed) = self.tables.popitem(last=False)
+            self.used -= freed
+
+    def drop_stale(self, fkey):
+        """Forget older versions (other mtime/size) of the same file."""
+        for key in [k for k in self.tables if k[0][0] == fkey[0] and k[0] != fkey]:
+            self.used -= self.tables.pop(key)[1]
+
+    def clear(self):
+        self.tables.clear()
+        self.used = 0
+
+
+TABLES = TableCache()
@@ -0,0 +1,94 @@
+import os
+import polars as pl
+from gazetteer import REFERENCE_DIR, segments
+
+#-------------------------------------------------------------------#
+# Account classification engine                                     #
+#-------------------------------------------------------------------#
+# reference/classification.csv holds every classification rule the  #
+# jobs apply (APPL_CODE by account range / product type, loan       #
+# ACCTSTATUS, the CCROWNER ACCTCODE):                               #
+#   VERSION   must equal RULES_VERSION                              #
+#   SCHEME    the output the rule feeds (DP_APPL_CODE, ...)         #
+#   PRIORITY  lower wins when several rules of a scheme match,      #
+#             i.e. the SAS IF that runs last                        #
+#   SOURCE    column the rule reads                                 #
+#   KIND      RANGE  LOW < SOURCE < HIGH (exclusive, as the SAS     #
+#                    IF 'lo' < ACCTNOC < 'hi'; blank HIGH = no cap) #
+#             KEY    SOURCE = LOW                                   #
+#   CODE      the value assigned                                    #
+# Ranges compile to one integer breakpoint array per SOURCE (one    #
+# search_sorted + gather), keys to one hashed replace_strict, and a #
+# scheme is the coalesce of its rules in PRIORITY order:            #
+#     df.with_columns(classify("DP_APPL_CODE").alias("APPL_CODE"))  #
+#-------------------------------------------------------------------#
+
+RULES_VERSION = 1
+OPEN_HIGH = 2 ** 62
+
+
+def load_rules(path: str = os.path.join(REFERENCE_DIR, "classification.csv")) -> pl.DataFrame:
+    rules = pl.read_csv(path, infer_schema=False).with_columns(
+        pl.col("VERSION", "PRIORITY").cast(pl.Int32)
+    )
+    versions = rules.get_column("VERSION").unique().to_list()
+    if versions != [RULES_VERSION]:
+        raise ValueError(f"{path}: rule table version {versions}, expected {RULES_VERSION}")
+    unknown = set(rules.get_column("KIND").unique()) - {"RANGE", "KEY"}
+    if unknown:
+        raise ValueError(f"{path}: unknown rule kind {sorted(unknown)}")
+    keys = rules.filter(pl.col("KIND") == "KEY")
+    if keys.select("SCHEME", "SOURCE", "LOW").is_duplicated().any():
+        raise ValueError(f"{path}: key listed twice in one scheme")
+    return rules
+
+
+def compile_ranges(rules: pl.DataFrame) -> tuple:
+    """(breakpoints, labels) of one SOURCE's RANGE rules, bounds made inclusive."""
+    ranges = (
+        rules.with_columns(
+            (pl.col("LOW").cast(pl.Int64) + 1).alias("LOW"),
+            (pl.col("HIGH").cast(pl.Int64) - 1).fill_null(OPEN_HIGH).alias("HIGH"),
+        )
+        .sort("LOW")
+    )
+    if (ranges["LOW"].shift(-1) <= ranges["HIGH"]).any():
+        raise ValueError(f"overlapping ranges for {rules['SCHEME'][0]}.{rules['SOURCE'][0]}")
+    return segments(ranges, "CODE", dtype=pl.Int64)
+
+
+def compile_rules(rules: pl.DataFrame) -> dict:
+    """SCHEME -> [(SOURCE, KIND, table)] in PRIORITY order."""
+    schemes = {}
+    steps = rules.group_by("SCHEME", "PRIORITY", "SOURCE", "KIND", maintain_order=True)
+    for (scheme, _, source, kind), group in sorted(steps, key=lambda g: g[0][:2]):
+        if kind == "RANGE":
+            table = compile_ranges(group)
+        else:
+            table = dict(group.select("LOW", "CODE").iter_rows())
+        schemes.setdefault(scheme, []).append((source, kind, table))
+    return schemes
+
+
+RULES = compile_rules(load_rules())
+
+
+def in_ranges(value: pl.Expr, breaks: pl.Series, labels: pl.Series) -> pl.Expr:
+    v = value.cast(pl.Int64, strict=False)
+    idx = pl.lit(breaks).search_sorted(v, side="right").cast(pl.Int64)
+    return pl.when(v.is_not_null()).then(pl.lit(labels).gather(idx))
+
+
+def in_keys(value: pl.Expr, table: dict) -> pl.Expr:
+    return value.cast(pl.Utf8).replace_strict(table, default=None, return_dtype=pl.Utf8)
+
+
+def classify(scheme: str, default=None) -> pl.Expr:
+    """CODE of the first matching rule of `scheme`, else `default` (null)."""
+    picks = [
+        in_ranges(pl.col(source), *table) if kind == "RANGE" else in_keys(pl.col(source), table)
+        for source, kind, table in RULES[scheme]
+    ]
+    if default is not None:
+        picks.append(default if isinstance(default, pl.Expr) else pl.lit(default))
+    return pl.coalesce(picks)
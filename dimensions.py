@@ -0,0 +1,82 @@
+import polars as pl
+from reader import load_input
+
+#-------------------------------------------------------------------#
+# Shared dimension cache for the bank control tables                #
+#-------------------------------------------------------------------#
+# The control tables (RLENCODE, DEMOCODE, BRANCH, OCCUP, MASCO,     #
+# MSIC) are a few thousand rows each. dimension() loads one through #
+# load_input once per process and keeps it as a key -> row mapping  #
+# (first row per key, as PROC SORT NODUPKEY before the MERGE):      #
+#     BRANCH = dimension("BRANCH", "ACCTBRCH", ["BRANCH_ABBR"])     #
+#     df.with_columns(BRANCH.lookup("ACCTBRCH"))                    #
+# lookup() hashes the key column once with replace_strict and then  #
+# gathers every value column by row number, i.e. a left join        #
+# without sorting or hashing the big side against the table.        #
+# Keys missing from the table give null, as the left join did; a    #
+# key that cannot be cast to the table's key dtype raises.          #
+# values=None keeps every column of the table, as the MERGE does; a #
+# key or value column the table does not have raises ValueError     #
+# with the columns it does have, instead of a null description.     #
+#-------------------------------------------------------------------#
+
+DIMENSIONS = {}
+
+
+class Dimension:
+    def __init__(self, keys: pl.Series, values: pl.DataFrame, name: str = "dimension"):
+        self.name = name
+        self.keys = keys
+        self.values = values
+        self.rows = pl.Series("row", range(len(keys)), dtype=pl.UInt32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def row_of(self, key) -> pl.Expr:
+        key = pl.col(key) if isinstance(key, str) else key
+        # strict: a key that does not convert to the table's dtype raises
+        # instead of turning into null and losing its description
+        return key.cast(self.keys.dtype, strict=True).replace_strict(
+            self.keys, self.rows, default=None, return_dtype=pl.UInt32
+        )
+
+    def lookup(self, key, columns=None, rename: dict = None) -> list:
+        """One expression per value column (all by default), aliased per rename."""
+        rename = rename or {}
+        require(self.values.columns, columns or [], self.name)
+        row = self.row_of(key)
+        return [
+            pl.lit(self.values.get_column(c)).gather(row).alias(rename.get(c, c))
+            for c in (columns or self.values.columns)
+        ]
+
+
+def require(available, columns, name: str):
+    missing = [c for c in columns if c not in available]
+    if missing:
+        raise ValueError(f"{name} has no column {', '.join(missing)}; it has {', '.join(available)}")
+
+
+def dimension(name: str, key: str, values=None, where: pl.Expr = None) -> Dimension:
+    """The control table `name` as key -> values (every other column by default),
+    filtered by `where`; cached per process."""
+    values = [values] if isinstance(values, str) else values
+    cache_key = (name, key, values and tuple(values), None if where is None else str(where))
+    if cache_key not in DIMENSIONS:
+        table = load_input(name)
+        if values is None:
+            values = [c for c in table.columns if c != key]
+        require(table.columns, [key] + list(values), name)
+        if where is not None:
+            table = table.filter(where)
+        table = (
+            table.select([key] + list(values))
+            .filter(pl.col(key).is_not_null())
+            .unique(subset=key, keep="first", maintain_order=True)
+        )
+        keys = table.get_column(key)
+        if keys.dtype == pl.Categorical:
+            keys = keys.cast(pl.Utf8)
+        DIMENSIONS[cache_key] = Dimension(keys, table.select(values), name)
+    return DIMENSIONS[cache_key]
@@ -0,0 +1,34 @@
+import polars as pl
+
+#-------------------------------------------------------------------#
+# Shared customer enrichment for two-sided relationship files       #
+#-------------------------------------------------------------------#
+# A relationship row names two customers (CUSTNO1 / CUSTNO2) and     #
+# both sides are enriched from the same customer tables (PRIMNAME,  #
+# ALLALIAS, ALLCUST). Joining every table once per side builds each #
+# table's hash table twice. Instead:                                #
+#     prof = profile(rel, ["CUSTNO1", "CUSTNO2"], [name, alias, cust]) #
+#     rel = attach(rel, prof, "CUSTNO1", "1")                       #
+#     rel = attach(rel, prof, "CUSTNO2", "2")                       #
+# profile() stacks both key columns into one distinct key column    #
+# and left-joins each table to it once, so only customers that      #
+# appear in the file are looked up. attach() probes the result      #
+# with one key column. Rows multiply exactly as in the per-side     #
+# joins (one per ALLALIAS line). In a lazy plan the profile is a    #
+# common subplan and is computed once for both attach() calls.      #
+#-------------------------------------------------------------------#
+
+
+def profile(frame, keys, tables, key: str = "CUSTNO"):
+    """Left-join `tables` (each keyed by `key`) to the distinct values of `keys`."""
+    ids = pl.concat([frame.select(pl.col(k).alias(key)) for k in keys]).unique()
+    for table in tables:
+        ids = ids.join(table, on=key, how="left")
+    return ids
+
+
+def attach(frame, prof, on: str, suffix: str, key: str = "CUSTNO"):
+    """Left-join the profile on column `on`, its columns renamed with `suffix`."""
+    columns = prof.collect_schema().names() if isinstance(prof, pl.LazyFrame) else prof.columns
+    renamed = prof.rename({c: (on if c == key else c + suffix) for c in columns})
+    return frame.join(renamed, on=on, how="left")
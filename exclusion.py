@@ -0,0 +1,46 @@
+import os
+import polars as pl
+from gazetteer import REFERENCE_DIR
+
+#-------------------------------------------------------------------#
+# Foreign-address exclusion                                         #
+#-------------------------------------------------------------------#
+# reference/exclusions.csv (LIST, TERM) holds the keyword lists the  #
+# address jobs screen on:                                           #
+#   ADDRESS  substrings that mark an address line as foreign        #
+#            (ADDRLINE NOT CONTAINS ...)                            #
+#   COUNTRY  COUNTRY values dropped outright (IF COUNTRY IN ...)    #
+# mentions() matches each address line against a whole list in one  #
+# pass with Polars' Aho-Corasick contains_any, so the lines are     #
+# never concatenated into ADDRLINE and scanned once per word.       #
+# COUNTRY is compared without trailing blanks, as SAS compares       #
+# character values.                                                 #
+#-------------------------------------------------------------------#
+
+ADDRESS_LINES = ["LINE1ADR", "LINE2ADR", "LINE3ADR", "LINE4ADR", "LINE5ADR"]
+
+
+def load_terms(path: str = os.path.join(REFERENCE_DIR, "exclusions.csv")) -> dict:
+    terms = pl.read_csv(path, schema_overrides={"LIST": pl.Utf8, "TERM": pl.Utf8})
+    return {
+        name: group.get_column("TERM").to_list()
+        for (name,), group in terms.group_by("LIST", maintain_order=True)
+    }
+
+
+TERMS = load_terms()
+
+
+def mentions(columns, terms) -> pl.Expr:
+    """Any of `columns` contains any of `terms` (null lines count as no match)."""
+    return pl.any_horizontal([
+        pl.col(c).str.contains_any(terms).fill_null(False) for c in columns
+    ])
+
+
+def foreign_address(lines=ADDRESS_LINES) -> pl.Expr:
+    return mentions(lines, TERMS["ADDRESS"])
+
+
+def foreign_country(column: str = "COUNTRY") -> pl.Expr:
+    return pl.col(column).cast(pl.Utf8).str.strip_chars_end().is_in(TERMS["COUNTRY"]).fill_null(False)
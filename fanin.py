@@ -0,0 +1,79 @@
+import polars as pl
+from sasops import nodupkey
+
+#-------------------------------------------------------------------#
+# Fan-in probe: one build side, many account sources                #
+#-------------------------------------------------------------------#
+# The CMD report matches MERGEALL with every account source (DP,    #
+# LN, SDB, UNICARD, COMCARD) BY ACCTNOC, keeps IF A AND B, runs     #
+# PROC SORT NODUPKEY BY ACCTNOC and SETs the results together.      #
+# A join per source hashes MERGEALL again every time. FanIn sorts   #
+# the MERGEALL keys once; each source is then NODUPKEY'd and probes #
+# that key array with search_sorted, and the MERGEALL columns are   #
+# gathered by row number:                                           #
+#     accounts = FanIn(mergeall, "ACCTNOC", [loans, safebox])       #
+#     mergeln, mergesdb = accounts.matches                          #
+#     output = accounts.stream([mergedp, mergeln, mergesdb])        #
+# The sources given to FanIn are probed in one collect_all, so they #
+# run concurrently, and the common schema of the matches (union of  #
+# columns, supertype per column) is settled once from them.         #
+# stream() aligns every part to it for a plain vertical concat;     #
+# columns only another part has (the DP merge) go after, with their #
+# own dtype. Source columns that clash with a MERGEALL column get   #
+# the "_right" suffix, as in the joins this replaces.               #
+#-------------------------------------------------------------------#
+
+ROW = "_ROW_"
+
+
+class FanIn:
+    def __init__(self, build, on: str = "ACCTNOC", sources=(), suffix: str = "_right"):
+        build = build.collect() if isinstance(build, pl.LazyFrame) else build
+        # MERGEALL is NODUPKEY BY ACCTNOC upstream; first row per key otherwise
+        self.table = nodupkey(build.filter(pl.col(on).is_not_null()), on)
+        self.keys = self.table.get_column(on)
+        self.on = on
+        self.matches = self.probe_all(sources, suffix) if sources else []
+        schemas = [self.table.schema] + [m.schema for m in self.matches]
+        self.schema = pl.concat([pl.DataFrame(schema=s) for s in schemas], how="diagonal_relaxed").schema
+
+    def __len__(self):
+        return len(self.table)
+
+    def probe(self, source, suffix: str = "_right") -> pl.LazyFrame:
+        """IF A AND B + NODUPKEY BY `on`: the MERGEALL row joined to each source account."""
+        on, n = self.on, len(self.keys)
+        keys = pl.lit(self.keys)
+        source = source.lazy().with_columns(pl.col(on).cast(self.keys.dtype, strict=False))
+        sources = source.collect_schema().names()
+        row = keys.search_sorted(pl.col(on)).cast(pl.Int64).clip(0, max(n - 1, 0))
+        matched = nodupkey(source, on).with_columns(row.alias(ROW))
+        matched = matched.filter(keys.gather(pl.col(ROW)) == pl.col(on)) if n else matched.clear()
+        built = [
+            pl.col(on) if c == on else pl.lit(self.table.get_column(c)).gather(pl.col(ROW)).alias(c)
+            for c in self.table.columns
+        ]
+        theirs = [
+            pl.col(c).alias(c + suffix if c in self.table.columns else c)
+            for c in sources if c != on
+        ]
+        return matched.select(built + theirs)
+
+    def probe_all(self, sources, suffix: str = "_right") -> list:
+        """probe() every source, evaluated together."""
+        return pl.collect_all([self.probe(s, suffix) for s in sources])
+
+    def stream(self, parts) -> pl.DataFrame:
+        """SET parts: one frame with the union of their columns, missing ones null."""
+        schemas = [p.collect_schema() if isinstance(p, pl.LazyFrame) else p.schema for p in parts]
+        common = dict(self.schema)
+        for s in schemas:
+            common.update((c, dtype) for c, dtype in s.items() if c not in common)
+        aligned = [
+            p.lazy().select([
+                pl.col(c).cast(dtype) if c in s else pl.lit(None, dtype=dtype).alias(c)
+                for c, dtype in common.items()
+            ])
+            for p, s in zip(parts, schemas)
+        ]
+        return pl.concat(aligned, how="vertical").collect()
@@ -0,0 +1,77 @@
+import os
+import polars as pl
+
+#-------------------------------------------------------------------#
+# Malaysian postcode gazetteer                                      #
+#-------------------------------------------------------------------#
+# reference/postcodes.csv holds the postcode ranges of CCRSADR4's   #
+# STATECODE step (LOW, HIGH, STATE) plus, where a range is a single #
+# town, its canonical CITY. The ranges are flattened into one sorted #
+# breakpoint array with a label per segment (gaps labelled null),    #
+# so a whole column resolves with one search_sorted and one gather: #
+#     df.with_columns(state_of(pl.col("NEW_ZIP")).alias("STATE"))   #
+# Zips that are not 5 digits, or fall between ranges, give null.    #
+#-------------------------------------------------------------------#
+
+REFERENCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reference")
+
+
+def load_ranges(path: str = os.path.join(REFERENCE_DIR, "postcodes.csv")) -> pl.DataFrame:
+    ranges = (
+        pl.read_csv(path, schema_overrides={"LOW": pl.Utf8, "HIGH": pl.Utf8, "STATE": pl.Utf8, "CITY": pl.Utf8})
+        .with_columns(pl.col("LOW", "HIGH").cast(pl.Int32))
+        .sort("LOW")
+    )
+    if (ranges["LOW"] > ranges["HIGH"]).any():
+        raise ValueError(f"{path}: range with LOW > HIGH")
+    if (ranges["LOW"].shift(-1) <= ranges["HIGH"]).any():
+        raise ValueError(f"{path}: overlapping postcode ranges")
+    return ranges
+
+
+def segments(ranges: pl.DataFrame, label: str, dtype=pl.Int32) -> tuple:
+    """(breakpoints, labels): labels[i] covers breakpoints[i-1] <= zip < breakpoints[i]."""
+    breaks, labels = [], [None]
+    for low, high, value in ranges.select("LOW", "HIGH", label).iter_rows():
+        if breaks and breaks[-1] != low:
+            breaks.append(low)          # gap before this range
+            labels.append(None)
+        elif not breaks:
+            breaks.append(low)
+        breaks.append(high + 1)
+        labels.append(value)
+    labels.append(None)                 # above the last range
+    return pl.Series(breaks, dtype=dtype), pl.Series(labels, dtype=pl.Utf8)
+
+
+RANGES = load_ranges()
+STATE_BREAKS, STATE_LABELS = segments(RANGES, "STATE")
+CITY_BREAKS, CITY_LABELS = segments(RANGES, "CITY")
+
+
+def zip_number(zip_code: pl.Expr) -> pl.Expr:
+    text = zip_code.cast(pl.Utf8).str.strip_chars()
+    return pl.when(text.str.contains(r"^\d{5}$")).then(text.cast(pl.Int32))
+
+
+def lookup(zip_code: pl.Expr, breaks: pl.Series, labels: pl.Series) -> pl.Expr:
+    z = zip_number(zip_code)
+    idx = pl.lit(breaks).search_sorted(z, side="right").cast(pl.Int64)
+    return pl.when(z.is_not_null()).then(pl.lit(labels).gather(idx))
+
+
+def state_of(zip_code: pl.Expr) -> pl.Expr:
+    """State code (JOH, KED, ..., W P) of a postcode column; null when unknown."""
+    return lookup(zip_code, STATE_BREAKS, STATE_LABELS)
+
+
+def city_of(zip_code: pl.Expr) -> pl.Expr:
+    """Canonical city where the gazetteer has one for the postcode's range."""
+    return lookup(zip_code, CITY_BREAKS, CITY_LABELS)
+
+
+def city_matches(zip_code: pl.Expr, city: pl.Expr) -> pl.Expr:
+    """False only when the postcode pins a city and `city` is not it."""
+    canonical = city_of(zip_code)
+    given = city.cast(pl.Utf8).str.strip_chars().str.to_uppercase()
+    return canonical.is_null() | given.str.starts_with(canonical).fill_null(False)
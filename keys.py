@@ -0,0 +1,122 @@
+import polars as pl
+
+#-------------------------------------------------------------------#
+# Integer customer / account keys                                   #
+#-------------------------------------------------------------------#
+# CUSTNO, CISNO and ACCTNO are 11-digit numbers that the JCL reads  #
+# as character fields ($20., $11.) or builds with PUT(ACCTNO,Z11.). #
+# Inside a job they are only joined, sorted and deduplicated, so    #
+# encode_keys() turns them into UInt64 once at ingest: 8 bytes per  #
+# row instead of an 11-byte string plus offsets, and integer        #
+# hashing and compares in every join. A text column is encoded      #
+# only when every value is exactly KEY_WIDTHS digits, so numeric    #
+# order is the order of the text and decode_keys() / key_text()     #
+# give back the very text that was read:                            #
+#     main, cart = encode_together([(main, "CISNO"),                #
+#                                   (cart, "CUSTNO")])              #
+#     publish("INDVDLY", decode_keys(df, "CISNO"), ...)             #
+# A shorter number ('123', or an integer key read as text) is       #
+# zero-padded to the width first, as the jobs' ZFILL(11) did, so    #
+# it still meets '00000000123' in the join. Any other column        #
+# (letters, blanks inside, a longer number) stays text, its digit   #
+# values padded all the same; encode_together() keeps every frame   #
+# of one join on the same dtype. to_key() is for keys that are Zw.  #
+# text by definition: blank gives null, anything else that is not   #
+# a number raises instead of silently dropping out of the joins.    #
+#-------------------------------------------------------------------#
+
+KEY_DTYPE = pl.UInt64
+
+# zero-padded text width of each key column
+KEY_WIDTHS = {
+    "CUSTNO": 11, "CUSTNO1": 11, "CUSTNO2": 11, "CUSTNOX": 11, "CISNO": 11, "GROUPID": 11,
+    "CUST1": 11, "CUST2": 11,
+    "ACCTNO": 11, "ACCTNOC": 11, "NOTENO": 5, "NOTENOC": 5,
+}
+
+
+def as_columns(columns) -> list:
+    return [columns] if isinstance(columns, str) else list(columns)
+
+
+def schema_of(df) -> dict:
+    return df.collect_schema() if isinstance(df, pl.LazyFrame) else df.schema
+
+
+def to_key(expr: pl.Expr, numeric: bool = False) -> pl.Expr:
+    """UInt64 key of a Zw. digit-string column (numeric=True: of a number column).
+
+    Blank text is null; non-digit text or a value past UInt64 raises.
+    """
+    if numeric:
+        return expr.cast(KEY_DTYPE, strict=True)
+    text = expr.str.strip_chars()
+    return pl.when(text == "").then(None).otherwise(text).cast(KEY_DTYPE, strict=True)
+
+
+def key_text(column: str, width: int = None) -> pl.Expr:
+    """Zero-padded text of a key column (Zw. format), null stays null."""
+    width = width or KEY_WIDTHS[column]
+    return pl.col(column).cast(pl.Utf8).str.zfill(width).alias(column)
+
+
+def pad_keys(df, columns):
+    """Zero-pad digit-only text keys shorter than KEY_WIDTHS; other text is left alone."""
+    current = schema_of(df)
+    pads = []
+    for c in as_columns(columns):
+        if c not in KEY_WIDTHS or current.get(c) not in (pl.Utf8, pl.Categorical):
+            continue
+        text = pl.col(c).cast(pl.Utf8)
+        digits = text.str.strip_chars()
+        pads.append(
+            pl.when(digits.str.contains(r"^[0-9]+$"))
+            .then(digits.str.zfill(KEY_WIDTHS[c]))
+            .otherwise(text)
+            .alias(c)
+        )
+    return df.with_columns(pads) if pads else df
+
+
+def encodable(df, column: str) -> bool:
+    """True when `column` can go to UInt64 and back to the same text."""
+    dtype = schema_of(df)[column]
+    if dtype == KEY_DTYPE or dtype.is_integer():
+        return True
+    if dtype not in (pl.Utf8, pl.Categorical) or column not in KEY_WIDTHS:
+        return False
+    pattern = rf"^[0-9]{{{KEY_WIDTHS[column]}}}$"
+    check = df.select(pl.col(column).cast(pl.Utf8).str.contains(pattern).fill_null(True).all())
+    if isinstance(check, pl.LazyFrame):
+        check = check.collect()
+    return bool(check.item())
+
+
+def encode_keys(df, columns):
+    """Cast the key columns of df (eager or lazy) to UInt64 where encodable()."""
+    df = pad_keys(df, columns)
+    current = schema_of(df)
+    casts = [
+        pl.col(c).cast(pl.Utf8).cast(KEY_DTYPE).alias(c) if not current[c].is_integer()
+        else pl.col(c).cast(KEY_DTYPE).alias(c)
+        for c in as_columns(columns)
+        if c in current and current[c] != KEY_DTYPE and encodable(df, c)
+    ]
+    return df.with_columns(casts) if casts else df
+
+
+def encode_together(pairs) -> list:
+    """encode_keys for frames joined on these keys: every column is encoded, or none
+    (and then every column is still zero-padded text)."""
+    pairs = [(df, [c for c in as_columns(cols) if c in schema_of(df)]) for df, cols in pairs]
+    pairs = [(pad_keys(df, cols), cols) for df, cols in pairs]
+    if all(encodable(df, c) for df, cols in pairs for c in cols):
+        return [encode_keys(df, cols) for df, cols in pairs]
+    return [df for df, _ in pairs]
+
+
+def decode_keys(df, columns):
+    """Zero-pad the integer key columns of df back to text."""
+    current = schema_of(df)
+    casts = [key_text(c) for c in as_columns(columns) if c in current and current[c].is_integer()]
+    return df.with_columns(casts) if casts else df
@@ -0,0 +1,249 @@
+import os
+import re
+import polars as pl
+from typing import NamedTuple
+from fixedwidth import Field
+
+#-------------------------------------------------------------------#
+# SAS INPUT / PUT layout compiler                                   #
+#-------------------------------------------------------------------#
+# The JCL members (*.txt) carry the authoritative record layouts:   #
+#     INPUT @05 CUSTNO $11. @32 EFFDATE PD5. ... ;                  #
+#     PUT   @01 CUSTNO $11. @15 CODE1   Z3.  ... ;                  #
+# compile_member() turns every DATA step's INPUT and PUT statements #
+# into Layout objects whose fields carry the narrowest correct      #
+# Polars dtype, so jobs type columns once at ingest.                #
+#-------------------------------------------------------------------#
+
+
+class Layout(NamedTuple):
+    """Pointer-positioned INPUT or PUT layout of one DATA step."""
+    data: str           # DATA step name (first output dataset)
+    dd: str             # INFILE DD for "input", FILE DD for "put"
+    kind: str           # "input" | "put"
+    fields: list
+
+    @property
+    def schema(self) -> dict:
+        return {f.name: f.dtype for f in self.fields if f.kind != "literal"}
+
+    @property
+    def lrecl(self) -> int:
+        return max(f.start - 1 + f.width for f in self.fields)
+
+    def select(self, names) -> "Layout":
+        wanted = set(names)
+        return self._replace(fields=[f for f in self.fields if f.name in wanted])
+
+    def rename(self, mapping: dict) -> "Layout":
+        return self._replace(fields=[
+            f._replace(name=mapping.get(f.name, f.name)) for f in self.fields
+        ])
+
+
+#-------------------------------------------------------------------#
+# Narrowest dtype for each informat                                 #
+#-------------------------------------------------------------------#
+def int_dtype(digits: int):
+    if digits <= 2:
+        return pl.Int8
+    if digits <= 4:
+        return pl.Int16
+    if digits <= 9:
+        return pl.Int32
+    if digits <= 18:
+        return pl.Int64
+    return pl.Float64
+
+
+DATE_FORMATS = {
+    ("YYMMDD", 10): "%Y-%m-%d", ("YYMMDD", 8): "%Y%m%d",
+    ("DDMMYY", 10): "%d-%m-%Y", ("DDMMYY", 8): "%d%m%Y",
+    ("MMDDYY", 10): "%m-%d-%Y", ("MMDDYY", 8): "%m%d%Y",
+}
+
+RE_CHAR = re.compile(r"^\$(?:CHAR)?(\d+)\.$")
+RE_PACKED = re.compile(r"^PD(\d+)\.(\d*)$")
+RE_ZFILL = re.compile(r"^Z(\d+)\.(\d*)$")
+RE_NUMBER = re.compile(r"^(\d+)\.(\d*)$")
+RE_DATE = re.compile(r"^(YYMMDD|DDMMYY|MMDDYY)N?(\d+)\.$")
+
+
+def compile_item(name: str, start: int, informat: str, kind: str,
+                 flag_codes: bool = False) -> Field:
+    """Translate one `@start NAME informat` item into a typed Field."""
+    informat = informat.upper()
+
+    m = RE_CHAR.match(informat)
+    if m:
+        width = int(m.group(1))
+        if width == 1 and flag_codes and kind == "input":
+            return Field(name, start, 1, "flag", dtype=pl.UInt8)
+        return Field(name, start, width, "char", dtype=pl.Utf8)
+
+    m = RE_PACKED.match(informat)
+    if m:
+        width, dec = int(m.group(1)), int(m.group(2) or 0)
+        dtype = pl.Float64 if dec else int_dtype(2 * width - 1)
+        return Field(name, start, width, "packed", dec, dtype)
+
+    m = RE_ZFILL.match(informat)
+    if m:
+        width, dec = int(m.group(1)), int(m.group(2) or 0)
+        dtype = pl.Float64 if dec else int_dtype(width)
+        # Zw.d reads like w.d; zero-filling is only how PUT writes it
+        return Field(name, start, width, "zoned" if kind == "input" else "zfill", dec, dtype)
+
+    m = RE_NUMBER.match(informat)
+    if m:
+        width, dec = int(m.group(1)), int(m.group(2) or 0)
+        dtype = pl.Float64 if dec else int_dtype(width)
+        return Field(name, start, width, "zoned" if kind == "input" else "number", dec, dtype)
+
+    m = RE_DATE.match(informat)
+    if m:
+        width = int(m.group(2))
+        fmt = DATE_FORMATS.get((m.group(1), width))
+        return Field(name, start, width, "date", dtype=pl.Date, fmt=fmt)
+
+    raise ValueError(f"unsupported informat {informat!r} for {name}")
+
+
+#-------------------------------------------------------------------#
+# Statement scanner                                                 #
+#-------------------------------------------------------------------#
+RE_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+RE_ITEM = re.compile(
+    r"@\s*(\d+)\s+"
+    r"(?:('[^']*'|\"[^\"]*\")"                         # @pos 'literal'
+    r"|([A-Za-z_][\w#]*)\s+(\$\s*\w*\d+\.\d*|\w+\.\d*))"  # @pos NAME informat
+)
+
+
+def sas_source(text: str) -> str:
+    """Drop JCL cards and SAS comments, keep the SYSIN statements."""
+    lines = [ln for ln in text.splitlines() if not ln.startswith("//")]
+    return RE_COMMENT.sub(" ", "\n".join(lines))
+
+
+def parse_items(statement: str, kind: str, flag_codes: bool = False) -> list:
+    fields = []
+    for m in RE_ITEM.finditer(statement):
+        start = int(m.group(1))
+        if m.group(2):
+            text = m.group(2)[1:-1]
+            fields.append(Field(text, start, len(text), "literal"))
+            continue
+        informat = re.sub(r"^\$\s+", "$", m.group(4))
+        fields.append(compile_item(m.group(3).upper(), start, informat, kind, flag_codes))
+    return fields
+
+
+def compile_source(text: str, flag_codes: bool = False) -> list:
+    """Compile every pointer-based INPUT and PUT statement in a member."""
+    layouts = []
+    data = infile = outfile = None
+    inputs = []
+
+    def close_step():
+        if inputs:
+            layouts.append(Layout(data, infile, "input", list(inputs)))
+        inputs.clear()
+
+    for raw in sas_source(text).split(";"):
+        stmt = " ".join(raw.split())
+        word = stmt.split(" ", 1)[0].upper() if stmt else ""
+
+        if word == "DATA":
+            close_step()
+            data = stmt.split()[1].split(".")[-1].upper() if len(stmt.split()) > 1 else None
+            infile = outfile = None
+        elif word in ("RUN", "PROC"):
+            close_step()
+        elif word == "INFILE":
+            infile = stmt.split()[1].upper()
+        elif word == "FILE":
+            outfile = stmt.split()[1].upper()
+        elif word == "INPUT":
+            inputs.extend(parse_items(stmt, "input", flag_codes))
+        elif word == "PUT" and outfile:
+            fields = parse_items(stmt, "put")
+            if fields:
+                layouts.append(Layout(data, outfile, "put", fields))
+    close_step()
+    return layouts
+
+
+MEMBER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def compile_member(path: str, flag_codes: bool = False) -> list:
+    """Compile a JCL member; relative names are looked up next to this module."""
+    with open(os.path.join(MEMBER_DIR, path), encoding="latin-1") as f:
+        return compile_source(f.read(), flag_codes)
+
+
+def find_layout(layouts, dd: str = None, data: str = None, kind: str = "input",
+                occurrence: int = 0) -> Layout:
+    """Pick a layout by DD and/or DATA step name (first match by default)."""
+    hits = [
+        lay for lay in layouts
+        if lay.kind == kind
+        and (dd is None or lay.dd == dd.upper())
+        and (data is None or lay.data == data.upper())
+    ]
+    if len(hits) <= occurrence:
+        raise KeyError(f"no {kind} layout for dd={dd} data={data}")
+    return hits[occurrence]
+
+
+def schema_cast(name: str, current, dtype) -> pl.Expr:
+    """Strict cast to the layout dtype; blank text is a missing value, as INPUT reads it."""
+    col = pl.col(name)
+    if current == pl.Utf8 and dtype != pl.Utf8:
+        text = col.str.strip_chars()
+        col = pl.when(text == "").then(None).otherwise(text)
+    return col.cast(dtype, strict=True).alias(name)
+
+
+def apply_schema(df, schema: dict):
+    """Cast the columns named in a compiled schema, once, at ingest (eager or lazy).
+
+    A value that does not fit its dtype raises instead of turning into null.
+    """
+    current = df.collect_schema() if isinstance(df, pl.LazyFrame) else df.schema
+    casts = [
+        schema_cast(name, current[name], dtype)
+        for name, dtype in schema.items()
+        if name in current and dtype is not None and current[name] != dtype
+    ]
+    return df.with_columns(casts) if casts else df
+
+
+#-------------------------------------------------------------------#
+# Low-cardinality code columns                                      #
+#-------------------------------------------------------------------#
+# The code columns below hold a handful of distinct values (often   #
+# blank-padded, O_APPL_CODE = 'DP   ') on every row of the widest    #
+# frames. encode_codes() stores the String ones as Categorical:     #
+# one UInt32 per row plus one copy of each distinct value, shared    #
+# process-wide, so joins, concats and sorts on them work across     #
+# frames and values compare exactly as before (padding kept). The   #
+# PUT writer and write_csv decode them back to text on output.      #
+#-------------------------------------------------------------------#
+CODE_COLUMNS = {
+    "INDORG", "INDORG1", "INDORG2", "GENDER", "CUSTTYPE", "CUSTTYPE1",
+    "APPL_CODE", "O_APPL_CODE", "ACCTCODE", "ACCTSTATUS",
+    "RLENCODE", "RLENCODE1", "IDTYPE", "STATE_CODE", "COUNTRY",
+}
+
+
+def encode_codes(df, columns=CODE_COLUMNS):
+    """Cast the String code columns of df to Categorical (eager or lazy)."""
+    current = df.collect_schema() if isinstance(df, pl.LazyFrame) else df.schema
+    casts = [
+        pl.col(name).cast(pl.Categorical)
+        for name, dtype in current.items()
+        if name in columns and dtype == pl.Utf8
+    ]
+    return df.with_columns(casts) if casts else df
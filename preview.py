@@ -0,0 +1,21 @@
+import os
+import polars as pl
+
+#-------------------------------------------------------------------#
+# Opt-in debug previews                                             #
+#-------------------------------------------------------------------#
+# Replaces the print(x.head(5)) after every step. Set CIS_PREVIEW=1 #
+# to see them; when unset, preview() returns before touching the    #
+# frame, so a LazyFrame is never collected just to be printed.      #
+#-------------------------------------------------------------------#
+
+ENABLED = os.environ.get("CIS_PREVIEW", "") not in ("", "0")
+
+
+def preview(label: str, frame, n: int = 5):
+    if not ENABLED:
+        return
+    if isinstance(frame, pl.LazyFrame):
+        frame = frame.head(n).collect()
+    print(f"{label}:")
+    print(frame.head(n))
@@ -0,0 +1,151 @@
+import atexit
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from functools import wraps
+import polars as pl
+
+#-------------------------------------------------------------------#
+# Per-step job profiler                                             #
+#-------------------------------------------------------------------#
+# Two ways to mark a step:                                          #
+#     with step("Part 10 DPTRBALS", dptrbals_raw) as s:             #
+#         dptrbals = ...                                            #
+#         s.output(dptrbals)                                        #
+# or, for straight-line scripts, a checkpoint closing the step that #
+# began at the previous checkpoint (or at import):                  #
+#     checkpoint("Part 2 ALIASFL", aliasfl)                         #
+# Each step records wall and CPU seconds, rows in/out, estimated    #
+# output bytes and the process RSS high-water mark. At exit one     #
+# JSON record for the whole run is written when CIS_PROFILE is set: #
+# "-" for stderr, otherwise a file path to append JSON lines to.    #
+# LazyFrames are never collected just to be counted.                #
+# background() is step() for work on a worker thread (the writer's  #
+# persist): CPU is that thread's own and the checkpoint chain of    #
+# the job is left alone.                                            #
+#-------------------------------------------------------------------#
+
+TARGET = os.environ.get("CIS_PROFILE", "")
+
+
+def peak_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024   # Linux reports KiB
+
+
+def frame_rows(frame):
+    return frame.height if isinstance(frame, pl.DataFrame) else None
+
+
+def frame_bytes(frame):
+    return frame.estimated_size() if isinstance(frame, pl.DataFrame) else None
+
+
+class Step:
+    def __init__(self, name: str, inputs=(), cpu=time.process_time):
+        self.name = name
+        self.cpu = cpu
+        counts = [frame_rows(f) for f in inputs]
+        self.rows_in = sum(counts) if counts and None not in counts else None
+        self.rows_out = self.bytes_out = None
+        self.wall0 = time.perf_counter()
+        self.cpu0 = cpu()
+
+    def output(self, frame):
+        self.rows_out = frame_rows(frame)
+        self.bytes_out = frame_bytes(frame)
+
+    def record(self) -> dict:
+        return {
+            "step": self.name,
+            "wall_s": round(time.perf_counter() - self.wall0, 6),
+            "cpu_s": round(self.cpu() - self.cpu0, 6),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "bytes_out": self.bytes_out,
+            "peak_rss": peak_rss_bytes(),
+        }
+
+
+class Run:
+    def __init__(self, job: str):
+        self.job = job
+        self.started = time.time()
+        self.wall0 = time.perf_counter()
+        self.steps = []
+        self.last = Step("start")
+
+    def record(self) -> dict:
+        return {
+            "job": self.job,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "wall_s": round(time.perf_counter() - self.wall0, 6),
+            "cpu_s": round(time.process_time(), 6),
+            "peak_rss": peak_rss_bytes(),
+            "steps": self.steps,
+        }
+
+
+RUN = Run(os.path.splitext(os.path.basename(sys.argv[0] or "interactive"))[0])
+
+
+@contextmanager
+def step(name: str, *inputs):
+    s = Step(name, inputs)
+    try:
+        yield s
+    finally:
+        RUN.steps.append(s.record())
+        RUN.last = Step(name)
+
+
+@contextmanager
+def background(name: str, *inputs):
+    s = Step(name, inputs, cpu=time.thread_time)
+    try:
+        yield s
+    finally:
+        RUN.steps.append(s.record())
+
+
+def checkpoint(name: str, frame=None, *inputs):
+    """Close the step that began at the previous checkpoint."""
+    s = RUN.last
+    s.name = name
+    if inputs:
+        s.rows_in = Step(name, inputs).rows_in
+    if frame is not None:
+        s.output(frame)
+    RUN.steps.append(s.record())
+    RUN.last = Step(name)
+
+
+def profiled(name: str = None):
+    """Decorator: profile a function as one step (frame args in, frame result out)."""
+    def wrap(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            frames = [a for a in args if isinstance(a, (pl.DataFrame, pl.LazyFrame))]
+            with step(name or fn.__name__, *frames) as s:
+                result = fn(*args, **kwargs)
+                s.output(result)
+            return result
+        return inner
+    return wrap
+
+
+def emit():
+    if not TARGET:
+        return
+    line = json.dumps(RUN.record(), default=str)
+    if TARGET == "-":
+        print(line, file=sys.stderr)
+    else:
+        with open(TARGET, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+atexit.register(emit)
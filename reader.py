@@ -0,0 +1,181 @@
+import os
+import polars as pl
+from fixedwidth import read_fb, record_length
+from layout import Layout, compile_member, find_layout, apply_schema, encode_codes
+from catalog import PATHS, TABLES, HANDOFF, register_path
+from sortorder import presorted
+
+#-------------------------------------------------------------------#
+# Shared input loader for the CIS batch ports                       #
+#-------------------------------------------------------------------#
+# load_input("NAME") resolves a logical dataset name (scan_input    #
+# does the same but returns a LazyFrame):                           #
+#   1. raw RECFM=FB unload in RAWDATA_DIR with a registered layout  #
+#      and a known LRECL -> decoded directly from EBCDIC (no        #
+#      conversion step)                                             #
+#   2. otherwise the pre-converted parquet in CONVERTED_DIR         #
+# Either way the columns come back typed by the compiled SAS layout #
+# (see layout.py), so jobs do not re-cast them downstream.          #
+# Names registered in catalog.PATHS override both locations, and    #
+# eager reads go through the catalog's LRU cache (catalog.TABLES).  #
+# A frame an upstream job published in this process                 #
+# (writer.publish) is returned from memory before any of that.      #
+# Datasets an upstream job writes in key order (register_order) are #
+# flagged sorted on load when they are, see sortorder.py.           #
+# With CIS_CATEGORICAL=1 the low-cardinality code columns come back  #
+# Categorical (layout.encode_codes).                                #
+#-------------------------------------------------------------------#
+
+RAWDATA_DIR = os.environ.get("CIS_RAWDATA_DIR", "cis_internal/rawdata")
+CONVERTED_DIR = os.environ.get("CIS_CONVERTED_DIR", "cis_internal/rawdata_converted")
+
+# CIS_CATEGORICAL=1 loads the layout.CODE_COLUMNS as Categorical
+CATEGORICAL = os.environ.get("CIS_CATEGORICAL", "0") == "1"
+
+# collect() engine for jobs that run as one lazy plan ("auto" | "streaming" | "in-memory")
+ENGINE = os.environ.get("CIS_ENGINE", "auto")
+
+# name -> (layout, lrecl); lrecl None = DCB not known, the raw unload is not read
+FB_DATASETS = {}
+
+# LRECL of catalogued inputs whose DCB is not in the JCL (DISP=SHR),
+# e.g. CIS_LRECL_CISRHOLD=...; see register_fb
+def dcb_lrecl(name: str):
+    value = os.environ.get(f"CIS_LRECL_{name}")
+    return int(value) if value else None
+
+# name -> key columns the producer writes it in
+SORTED_BY = {}
+
+
+def register_fb(name: str, fields, lrecl: int = None):
+    """Declare the SAS INPUT layout (a Layout or a list of Fields) of a raw FB dataset.
+
+    lrecl is the record length from the dataset's DCB. Without it only the
+    converted parquet is read (typed by the layout): an INPUT that stops
+    short of the record would decode every record after the first misaligned.
+    """
+    if isinstance(fields, Layout):
+        fields = fields.fields
+    fields = list(fields)
+    if lrecl is not None and lrecl < record_length(fields):
+        raise ValueError(f"{name}: layout reaches byte {record_length(fields)}, past LRECL {lrecl}")
+    FB_DATASETS[name] = (fields, lrecl)
+
+
+def register_order(name: str, by):
+    SORTED_BY[name] = [by] if isinstance(by, str) else list(by)
+
+
+def flag_order(name: str, df: pl.DataFrame) -> pl.DataFrame:
+    """Flag df sorted by the longest registered key prefix it still carries."""
+    keys = []
+    for k in SORTED_BY.get(name, ()):
+        if k not in df.columns:
+            break
+        keys.append(k)
+    return presorted(df, keys) if keys else df
+
+
+def encode(df):
+    return encode_codes(df) if CATEGORICAL else df
+
+
+def input_schema(name: str) -> dict:
+    fields, _ = FB_DATASETS.get(name, ([], None))
+    return {f.name: f.dtype for f in fields if f.dtype is not None}
+
+
+def raw_path(name: str) -> str:
+    return os.path.join(RAWDATA_DIR, name)
+
+
+def converted_path(name: str) -> str:
+    return os.path.join(CONVERTED_DIR, f"{name}.parquet")
+
+
+def resolve(name: str) -> tuple:
+    """(physical path, is raw FB) for a logical or DD-style dataset name."""
+    if name in PATHS:
+        path = PATHS[name]
+        return path, name in FB_DATASETS and not path.endswith(".parquet")
+    if FB_DATASETS.get(name, (None, None))[1] and os.path.exists(raw_path(name)):
+        return raw_path(name), True
+    return converted_path(name), False
+
+
+def load_input(name: str, columns=None) -> pl.DataFrame:
+    """columns= limits the read to those fields (byte ranges / parquet columns)."""
+    if name in HANDOFF:
+        df = HANDOFF[name]
+        return df if columns is None else df.select(columns)
+    path, is_fb = resolve(name)
+    if is_fb:
+        fields, lrecl = FB_DATASETS[name]
+        if lrecl is None:
+            raise ValueError(f"{name}: no LRECL for {path}, set CIS_LRECL_{name} from the DCB")
+        loader = lambda cols: flag_order(name, encode(read_fb(path, fields, lrecl, cols)))
+    else:
+        loader = lambda cols: flag_order(
+            name, encode(apply_schema(pl.read_parquet(path, columns=cols), input_schema(name)))
+        )
+    return TABLES.get(path, columns, loader)
+
+
+def scan_input(name: str, columns=None) -> pl.LazyFrame:
+    """Lazy load_input: select()/filter() on the result are pushed into the parquet scan."""
+    path, is_fb = resolve(name)
+    if is_fb or name in HANDOFF:
+        return load_input(name, columns).lazy()
+    lf = pl.scan_parquet(path)
+    if columns is not None:
+        lf = lf.select(columns)
+    return encode(apply_schema(lf, input_schema(name)))
+
+
+#-------------------------------------------------------------------#
+# Layouts compiled from the JCL members                             #
+#-------------------------------------------------------------------#
+# Parquet column names follow the unload, not the SAS variable, so  #
+# a few fields are renamed to match the converted files.            #
+#-------------------------------------------------------------------#
+CCRNIDIC = compile_member("CCRNIDIC.txt")
+CCRTAX3B = compile_member("CCRTAX3B.txt")
+
+# The CIDI* unloads and CISRHOLD are DISP=SHR with no DCB in the JCL;
+# their LRECL is catalogued. The raw unload is read only when
+# CIS_LRECL_<name> gives it, otherwise the converted parquet is used.
+
+# RBP2.B033.UNLOAD.CIDICUST.FB  (CCRNIDIC - MAINFILE)
+register_fb("CIDICUST_FB", find_layout(CCRNIDIC, dd="MAINFILE").rename({"CUSTNO": "CISNO"}),
+            lrecl=dcb_lrecl("CIDICUST_FB"))
+
+# RBP2.B033.UNLOAD.CIDICART.FB  (CCRNIDIC - CARTFILE)
+register_fb("CIDICART_FB", find_layout(CCRNIDIC, dd="CARTFILE"), lrecl=dcb_lrecl("CIDICART_FB"))
+
+# RBP2.B033.UNLOAD.CIDINDVT.FB  (CCRNIDIC - INDVFILE)
+register_fb("CIDINDVT_FB", find_layout(CCRNIDIC, dd="INDVFILE"), lrecl=dcb_lrecl("CIDINDVT_FB"))
+
+# RBP2.B033.UNLOAD.CIDIORGT.FB  (CCRNIDIC - ORGFILE)
+register_fb("CIDIORGT_FB", find_layout(CCRNIDIC, dd="ORGFILE"), lrecl=dcb_lrecl("CIDIORGT_FB"))
+
+# RBP2.B033.RHOLD.FULL.LIST  (CCRTAX3B - CISRHOLD)
+# only ID1/ID2 at @545/@565 are read from the wider record
+register_fb("CISRHOLD", find_layout(CCRTAX3B, dd="CISRHOLD"), lrecl=dcb_lrecl("CISRHOLD"))
+
+#-------------------------------------------------------------------#
+# Outputs of upstream jobs read by later jobs                       #
+#-------------------------------------------------------------------#
+# RBP2.B033.CIS.IDIC.DAILY.INDV / ORG  (CCRNIDIC -> CICISCOM INDFILE)
+register_path("INDVDLY", "cis_internal/output/INDVDLY.parquet")
+register_path("ORGDLY", "cis_internal/output/ORGDLY.parquet")
+register_order("INDVDLY", "CUSTNO")
+register_order("ORGDLY", "CUSTNO")
+# RLNSHIP  (CCRCCRLN -> CICMDRPT2 customer groups)
+register_path("RLNSHIP", "cis_internal/output/RLNSHIP.parquet")
+
+# RLNSHIP split by CCRCCRLN, written in CUSTNO1 order  (CCRCCRL1 CCRLEN1 / CCRLEN)
+register_path("RLNSHIP_RLNIND", "cis_internal/output/RLNSHIP_RLNIND.parquet")
+register_path("RLNSHIP_RLNORG", "cis_internal/output/RLNSHIP_RLNORG.parquet")
+register_order("RLNSHIP_RLNIND", "CUSTNO1")
+register_order("RLNSHIP_RLNORG", "CUSTNO1")
@@ -0,0 +1,62 @@
+import json
+import os
+import polars as pl
+from catalog import file_key
+from reader import load_input, resolve
+from writer import persist
+
+#-------------------------------------------------------------------#
+# RHOLD screening index                                             #
+#-------------------------------------------------------------------#
+# RBP2.B033.RHOLD.FULL.LIST is screened by ID1/ID2 only. The index   #
+# is the sorted, unique, non-blank set of those IDs (the CCRTAX3B    #
+# RHOLD step after PROC SORT NODUPKEY BY ALIAS), kept in             #
+# INDEX_DIR as NAME.index.parquet with a NAME.index.json stamp of    #
+# the source file (path, mtime, size) and INDEX_VERSION. It is       #
+# rebuilt only when the stamp no longer matches, so a run against an #
+# unchanged RHOLD list reads a few MB of IDs instead of decoding the #
+# whole list. flags() screens columns against it with is_in, which  #
+# hashes the index once per call.                                   #
+#-------------------------------------------------------------------#
+
+INDEX_DIR = os.environ.get("CIS_INDEX_DIR", "cis_internal/index")
+INDEX_VERSION = 1
+
+
+def build(ids: pl.DataFrame) -> pl.Series:
+    """ALIAS = ID1 / ALIAS = ID2, non-blank, NODUPKEY BY ALIAS."""
+    aliases = pl.concat([ids.get_column(c) for c in ids.columns]).alias("ALIAS")
+    return aliases.filter(aliases.is_not_null() & (aliases != "")).unique().sort()
+
+
+def index_paths(name: str) -> tuple:
+    base = os.path.join(INDEX_DIR, f"{name}.index")
+    return f"{base}.parquet", f"{base}.json"
+
+
+def load_index(name: str = "CISRHOLD", columns=("ID1", "ID2")) -> pl.Series:
+    """The screening IDs of `name`, from the persisted index when it is current."""
+    source, _ = resolve(name)
+    stamp = {"version": INDEX_VERSION, "source": list(file_key(source)), "columns": list(columns)}
+    data, meta = index_paths(name)
+
+    if os.path.exists(data) and os.path.exists(meta):
+        with open(meta, encoding="utf-8") as f:
+            if json.load(f) == stamp:
+                return pl.read_parquet(data).get_column("ALIAS").set_sorted()
+
+    aliases = build(load_input(name, columns=list(columns)))
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    persist(aliases.to_frame(), data)
+    with open(f"{meta}.tmp", "w", encoding="utf-8") as f:
+        json.dump(stamp, f)
+    os.replace(f"{meta}.tmp", meta)
+    return aliases
+
+
+def flags(index: pl.Series, **columns) -> list:
+    """One Boolean expression per name=column: the column's value is in the index."""
+    return [
+        pl.col(col).is_in(index.implode()).fill_null(False).alias(name)
+        for name, col in columns.items()
+    ]
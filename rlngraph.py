@@ -0,0 +1,265 @@
+from typing import NamedTuple
+import numpy as np
+import polars as pl
+
+#-------------------------------------------------------------------#
+# Customer-to-customer relationship graph (CSR)                     #
+#-------------------------------------------------------------------#
+# RLEN#CC / RLNSHIP rows are edges CUST1 -> CUST2 with CODE1 (what   #
+# CUST2 is to CUST1), CODE2 (the converse) and EFFDATE. build()     #
+# stores them as compressed sparse rows over the sorted customer    #
+# numbers (integer-encoded, see keys.py):                           #
+#     nodes     sorted distinct CUSTNO, node i = nodes[i]           #
+#     offsets   edges of node i are offsets[i]:offsets[i+1]         #
+#     targets   node index at the other end of each edge            #
+#     attrs     CODE1 / CODE2 / EFFDATE in the same order           #
+# once per direction. The reverse copy has CODE1 / CODE2 swapped,   #
+# so CODE1 is always the code seen from the node the edge leaves -  #
+# the CCROWNER "flip" without a second table. Neighbours of a node  #
+# are one slice; expand() attaches the neighbours of a whole key    #
+# column with a repeat + gather instead of a join.                  #
+#-------------------------------------------------------------------#
+
+FORWARD, REVERSE = "forward", "reverse"
+
+
+class Adjacency(NamedTuple):
+    offsets: np.ndarray     # int64, len(nodes) + 1
+    targets: np.ndarray     # int64 node indices, one per edge
+    attrs: pl.DataFrame     # edge attributes, one row per edge
+
+    def degree(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+
+def csr(src: np.ndarray, dst: np.ndarray, attrs: pl.DataFrame, n: int) -> Adjacency:
+    order = np.argsort(src, kind="stable")
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+    return Adjacency(offsets, dst[order], attrs[order] if attrs.width else attrs)
+
+
+class RelationshipGraph:
+    def __init__(self, nodes: pl.Series, forward: Adjacency, reverse: Adjacency):
+        self.nodes = nodes
+        self.forward = forward
+        self.reverse = reverse
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.forward.targets)
+
+    def adjacency(self, direction: str = FORWARD) -> Adjacency:
+        return self.forward if direction == FORWARD else self.reverse
+
+    def index(self, keys) -> np.ndarray:
+        """Node index of each key, -1 where the customer has no relationship."""
+        keys = pl.Series(keys).cast(self.nodes.dtype, strict=False)
+        pos = self.nodes.search_sorted(keys, side="left").to_numpy().astype(np.int64)
+        hit = pos < len(self.nodes)
+        hit[hit] = (self.nodes.gather(pos[hit]) == keys.filter(pl.Series(hit))).fill_null(False).to_numpy()
+        return np.where(hit, pos, -1)
+
+    def neighbours(self, key, direction: str = FORWARD, to: str = "CUSTNO2") -> pl.DataFrame:
+        """Edges leaving one customer: `to` plus the edge attributes."""
+        adj = self.adjacency(direction)
+        i = self.index([key])[0]
+        lo, hi = (adj.offsets[i], adj.offsets[i + 1]) if i >= 0 else (0, 0)
+        return adj.attrs[lo:hi].with_columns(self.nodes.gather(adj.targets[lo:hi]).alias(to))
+
+    def expand(self, frame: pl.DataFrame, on: str, direction: str = FORWARD,
+               to: str = "CUSTNO2") -> pl.DataFrame:
+        """One row per (frame row, edge leaving frame[on]); rows without edges drop,
+        as an inner join on `on` would."""
+        adj = self.adjacency(direction)
+        idx = self.index(frame.get_column(on))
+        start = np.where(idx >= 0, adj.offsets[idx], 0)
+        count = np.where(idx >= 0, adj.offsets[idx + 1] - start, 0)
+        rows = np.repeat(np.arange(len(frame)), count)
+        # edge positions: start of each row's slice plus 0..count-1
+        firsts = np.repeat(start - np.cumsum(count) + count, count)
+        edges = firsts + np.arange(len(rows))
+        return pl.concat([
+            frame[rows],
+            adj.attrs[edges],
+            self.nodes.gather(adj.targets[edges]).alias(to).to_frame(),
+        ], how="horizontal")
+
+    def edges(self, direction: str = FORWARD, src: str = "CUSTNO1", to: str = "CUSTNO2") -> pl.DataFrame:
+        """The flat edge list of one direction."""
+        adj = self.adjacency(direction)
+        owner = np.repeat(np.arange(len(self.nodes)), adj.degree())
+        return adj.attrs.with_columns(
+            self.nodes.gather(owner).alias(src),
+            self.nodes.gather(adj.targets).alias(to),
+        )
+
+
+def build(edges: pl.DataFrame, src: str = "CUSTNO1", dst: str = "CUSTNO2",
+          attrs=("CODE1", "CODE2", "EFFDATE"), swap=("CODE1", "CODE2")) -> RelationshipGraph:
+    """CSR graph of `edges` in both directions; `swap` attributes trade places in reverse."""
+    attrs = [a for a in attrs if a in edges.columns]
+    edges = edges.filter(pl.col(src).is_not_null() & pl.col(dst).is_not_null())
+    ends = pl.concat([edges.get_column(src), edges.get_column(dst)])
+    if ends.dtype.is_numeric():
+        # one sort gives both the node list and every endpoint's index
+        uniq, inv = np.unique(ends.to_numpy(), return_inverse=True)
+        nodes = pl.Series(src, uniq, dtype=ends.dtype)
+    else:
+        nodes = ends.unique().sort()
+        inv = nodes.search_sorted(ends).to_numpy()
+    inv = inv.astype(np.int64).reshape(-1)
+    s, d = inv[:edges.height], inv[edges.height:]
+    fwd_attrs = edges.select(attrs)
+    a, b = swap
+    rev_attrs = fwd_attrs.rename({a: b, b: a}).select(attrs) if a in attrs and b in attrs else fwd_attrs
+    return RelationshipGraph(
+        nodes.set_sorted(),
+        csr(s, d, fwd_attrs, len(nodes)),
+        csr(d, s, rev_attrs, len(nodes)),
+    )
+
+
+#-------------------------------------------------------------------#
+# Connected groups and exposure rollup                              #
+#-------------------------------------------------------------------#
+# groups() labels every customer of the graph with GROUPID, the     #
+# lowest CUSTNO it is connected to through relationship edges       #
+# (direction ignored); only edges with CODE1 or CODE2 in `codes`    #
+# count when codes is given. The groups are the connected           #
+# components, found by union-find on the edge arrays: every edge    #
+# hooks the higher root under the lower one, then pointer jumping   #
+# flattens the trees; edges already inside one tree drop out each   #
+# round. No self-joins, so tens of millions of edges stay a few     #
+# arrays.                                                           #
+# max_hops caps how far a group reaches. The lowest ungrouped       #
+# customer becomes a seed, and its group is every ungrouped         #
+# customer within max_hops edges of it, walking through ungrouped   #
+# customers only; repeat until everyone has a group. Every customer #
+# is in exactly one group, GROUPID is the seed's CUSTNO and every   #
+# member is at most max_hops edges from it inside the group.        #
+# Seeds of different components cannot meet, so each round takes   #
+# the lowest customer of every component left at once.              #
+# exposure() adds the account side: customers without edges form   #
+# their own group, and LEDGERBAL is summed per customer and per     #
+# group (an account held by several members counts once).          #
+#-------------------------------------------------------------------#
+
+
+def code_filter(codes) -> pl.Expr:
+    codes = pl.Series([str(c).strip() for c in codes], dtype=pl.Utf8).implode()
+    return pl.any_horizontal(
+        pl.col(c).cast(pl.Utf8).str.strip_chars().is_in(codes) for c in ("CODE1", "CODE2")
+    )
+
+
+def undirected(graph: RelationshipGraph, codes=None) -> tuple:
+    """(src, dst) node indices of every edge once, optionally filtered by code."""
+    adj = graph.forward
+    s = np.repeat(np.arange(len(graph), dtype=np.int64), adj.degree())
+    d = adj.targets
+    if codes is not None:
+        keep = adj.attrs.select(code_filter(codes)).to_series().fill_null(False).to_numpy()
+        s, d = s[keep], d[keep]
+    return s, d
+
+
+def union_find(n: int, s: np.ndarray, d: np.ndarray) -> np.ndarray:
+    """Lowest node index of each node's connected component."""
+    label = np.arange(n, dtype=np.int64)
+    while len(s):
+        ls, ld = label[s], label[d]
+        live = ls != ld
+        s, d, ls, ld = s[live], d[live], ls[live], ld[live]
+        if not len(s):
+            break
+        np.minimum.at(label, np.maximum(ls, ld), np.minimum(ls, ld))
+        while True:
+            up = label[label]
+            if np.array_equal(up, label):
+                break
+            label = up
+    return label
+
+
+def hop_groups(n: int, s: np.ndarray, d: np.ndarray, max_hops: int) -> np.ndarray:
+    """Seed node index of each node: seeds in node order claim what is within max_hops."""
+    if max_hops < 0:
+        raise ValueError(f"max_hops must be 0 or more, got {max_hops}")
+    group = np.full(n, -1, dtype=np.int64)
+    while (free := group < 0).any():
+        keep = free[s] & free[d]
+        s, d = s[keep], d[keep]
+        root = union_find(n, s, d)
+        # the lowest free node of every component left is its seed
+        reached = free & (root == np.arange(n))
+        frontier = reached.copy()
+        for _ in range(max_hops):
+            step = np.zeros(n, dtype=bool)
+            step[d[frontier[s]]] = True
+            step[s[frontier[d]]] = True
+            step &= ~reached
+            if not step.any():
+                break
+            reached |= step
+            frontier = step
+        group[reached] = root[reached]
+    return group
+
+
+def components(graph: RelationshipGraph, codes=None, max_hops: int = None) -> np.ndarray:
+    """Node index of each node's group root (its lowest-numbered member)."""
+    s, d = undirected(graph, codes)
+    if max_hops is not None:
+        return hop_groups(len(graph), s, d, max_hops)
+    return union_find(len(graph), s, d)
+
+
+def groups(graph: RelationshipGraph, codes=None, max_hops: int = None,
+           key: str = "CUSTNO") -> pl.DataFrame:
+    """key, GROUPID for every customer in the graph."""
+    root = components(graph, codes, max_hops)
+    return pl.DataFrame([graph.nodes.alias(key), graph.nodes.gather(root).alias("GROUPID")])
+
+
+def exposure(members: pl.DataFrame, accounts: pl.DataFrame, key: str = "CUSTNO",
+             account: str = "ACCTNOC", amount: str = "LEDGERBAL") -> tuple:
+    """(per customer, per group) LEDGERBAL rollup of `accounts` over `members`."""
+    accounts = (
+        accounts.select(key, account, pl.col(amount).cast(pl.Float64, strict=False))
+        .filter(pl.col(key).is_not_null())
+    )
+    customers = pl.concat([
+        members.select(key, "GROUPID"),
+        accounts.select(key, pl.col(key).alias("GROUPID")),
+    ]).unique(subset=key, keep="first", maintain_order=True)
+    held = (
+        accounts.join(customers, on=key, how="inner")
+        .unique(subset=["GROUPID", account], keep="first", maintain_order=True)
+    )
+    totals = (
+        customers.group_by("GROUPID").agg(pl.len().alias("GROUP_CUSTOMERS"))
+        .join(
+            held.group_by("GROUPID").agg(
+                pl.len().alias("GROUP_ACCOUNTS"),
+                pl.col(amount).sum().alias(f"GROUP_{amount}"),
+            ),
+            on="GROUPID", how="left",
+        )
+        .with_columns(
+            pl.col("GROUP_ACCOUNTS").fill_null(0),
+            pl.col(f"GROUP_{amount}").fill_null(0.0),
+        )
+        .sort("GROUPID")
+    )
+    own = accounts.group_by(key).agg(pl.col(amount).sum())
+    per_customer = (
+        customers.join(own, on=key, how="left")
+        .with_columns(pl.col(amount).fill_null(0.0))
+        .join(totals, on="GROUPID", how="left")
+        .sort("GROUPID", key)
+    )
+    return per_customer, totals
@@ -0,0 +1,70 @@
+import polars as pl
+from sortorder import as_keys, order_by
+
+#-------------------------------------------------------------------#
+# SAS BY-group operators                                            #
+#-------------------------------------------------------------------#
+#     PROC SORT NODUPKEY; BY CUSTNO;      -> nodupkey(df, "CUSTNO")  #
+#     IF FIRST.CUSTNO;                    -> first_by(df, "CUSTNO")  #
+#     IF LAST.CUSTNO;                     -> last_by(df, "CUSTNO")   #
+#     FIRST.x / LAST.x as columns         -> by_flags(df, by)        #
+# Each puts the frame in BY order with order_by (a stable sort,     #
+# skipped when the frame is already in that order) and then makes   #
+# one vectorized pass comparing every row with its neighbour, so    #
+# the row kept per group is the one SAS keeps, not whichever a hash #
+# dedup happens to return. Works on DataFrames and LazyFrames.      #
+# unique(subset=...) remains right where any row of a group will do.#
+#-------------------------------------------------------------------#
+
+FIRST_MARK = "_FIRST_"
+
+
+def is_start(by) -> pl.Expr:
+    """FIRST.<last BY variable>: the row opens a new BY group."""
+    changed = [pl.col(k).ne_missing(pl.col(k).shift(1)) for k in as_keys(by)]
+    return pl.any_horizontal(changed) | (pl.int_range(pl.len()) == 0)
+
+
+def is_end(by) -> pl.Expr:
+    """LAST.<last BY variable>: the row closes its BY group."""
+    changed = [pl.col(k).ne_missing(pl.col(k).shift(-1)) for k in as_keys(by)]
+    return pl.any_horizontal(changed) | (pl.int_range(pl.len()) == pl.len() - 1)
+
+
+def by_flags(frame, by, descending=False, prefix: tuple = ("FIRST_", "LAST_")):
+    """Add FIRST_<var> / LAST_<var> (Boolean) for every BY variable, in BY order."""
+    keys = as_keys(by)
+    frame = order_by(frame, keys, descending)
+    first, last = prefix
+    return frame.with_columns(
+        [is_start(keys[: i + 1]).alias(first + k) for i, k in enumerate(keys)]
+        + [is_end(keys[: i + 1]).alias(last + k) for i, k in enumerate(keys)]
+    )
+
+
+def first_by(frame, by, descending=False):
+    """IF FIRST.<last BY variable>: first row of every BY group, in BY order."""
+    return order_by(frame, by, descending).filter(is_start(by))
+
+
+def last_by(frame, by, descending=False):
+    """IF LAST.<last BY variable>: last row of every BY group, in BY order."""
+    return order_by(frame, by, descending).filter(is_end(by))
+
+
+def nodupkey(frame, by, descending=False, dupout: bool = False):
+    """PROC SORT NODUPKEY: keep the first row of each key (input order breaks ties).
+
+    With dupout=True returns (kept, dropped), as DUPOUT= would.
+    """
+    frame = order_by(frame, by, descending)
+    if not dupout:
+        return frame.filter(is_start(by))
+    # one FIRST. mask splits the rows; a lazy plan caches the marked frame
+    # and evaluates it once for both outputs
+    if isinstance(frame, pl.LazyFrame):
+        marked = frame.with_columns(is_start(by).alias(FIRST_MARK))
+        first = pl.col(FIRST_MARK)
+        return marked.filter(first).drop(FIRST_MARK), marked.filter(~first).drop(FIRST_MARK)
+    first = frame.select(is_start(by)).to_series()
+    return frame.filter(first), frame.filter(~first)
@@ -0,0 +1,368 @@
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+#-------------------------------------------------------------------#
+# Batch stream scheduler                                            #
+#-------------------------------------------------------------------#
+# Each job is a JCL member NAME.txt run by its live port, PORTS.    #
+# Edges come from the data the jobs share:                          #
+#   - DD statements: DISP=NEW (or MOD kept) produces the DSN,       #
+#     DISP=SHR/OLD consumes it; &&temporaries stay inside the job   #
+#   - the ports: load_input / scan_input / read_parquet consume,    #
+#     write_parquet / write_csv / write_put / publish produce       #
+# Ready jobs run concurrently, each in its own Python process, and  #
+# the one heading the longest remaining chain starts first, so the  #
+# stream takes about as long as its critical path.                  #
+# Job durations for the critical path come from the profiler log    #
+# (CIS_PROFILE, see profiler.py); unknown jobs count as 1 second.   #
+# With --in-process each connected group of jobs runs in one worker #
+# process, so frames a producer publishes (writer.publish) reach    #
+# the consumer in memory. The trade-off: jobs of one group run one  #
+# after another, highest critical path first among those ready, so  #
+# branches of a group no longer overlap (CCRCCRL1 and CICMDRPT both #
+# wait on CCRCCRLN and then on each other); separate groups still   #
+# run concurrently. When a group's branches outweigh the parquet    #
+# round trip they save, run without --in-process.                   #
+#-------------------------------------------------------------------#
+
+JOB_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# JCL member -> the port that runs it. The other scripts are earlier
+# drafts of the same member, kept for reference and never scheduled.
+PORTS = {
+    "CCRCCRL1": "CCRCCRL1.py",
+    "CCRCCRLN": "CCRCCRLN.py",
+    "CCRNIDIC": "CCRNIDIC.py",
+    "CCRNMX3B": "CCRNMX3B.py",
+    "CCROWNER": "CCROWNER.py",      # draft: CCROWNER2.py
+    "CCRSADDP": "CCRSADDP.py",      # draft: CCRSADDP2.py
+    "CCRSADR4": "CCRSADR4.py",      # draft: CCRSADR4(2).py
+    "CCRTAX3B": "CCRTAX3B.py",
+    "CICISCOM": "CICISCOM1.py",     # draft: CICISCOM.py
+    "CICMDRPT": "CICMDRPT2.py",     # drafts: CICMDRPT.py, CICMDRPT1.py
+}
+
+RE_DD = re.compile(r"^//(\S*)\s+DD\s+(.*)$")
+RE_CONT = re.compile(r"^//\s+(\S.*)$")
+RE_DSN = re.compile(r"DSN=([^,\s]+)")
+RE_DISP = re.compile(r"DISP=(\([^)]*\)|\w+)")
+RE_GDG = re.compile(r"\([+-]?\d+\)$")
+
+RE_PY_IN = re.compile(
+    r"""(?:load_input|scan_input)\(\s*["']([^"']+)["']"""
+    r"""|(?:read_parquet|scan_parquet|read_csv)\(\s*f?["']([^"']+)["']"""
+)
+RE_PY_OUT = re.compile(
+    r"""(?:write_parquet|write_csv|sink_parquet)\(\s*f?["']([^"']+)["']"""
+    r"""|write_put\([^)]*?,\s*f?["']([^"']+)["']"""
+    r"""|publish\(\s*["']([^"']+)["']"""
+)
+
+
+#-------------------------------------------------------------------#
+# Producer / consumer extraction                                    #
+#-------------------------------------------------------------------#
+def dd_statements(text: str):
+    """Yield the parameter string of every DD statement, continuations joined."""
+    params = None
+    for ln in text.splitlines():
+        if not ln.startswith("//") or ln.startswith("//*"):
+            if params is not None:
+                yield params
+                params = None
+            continue
+        ln = ln[:72].rstrip()
+        m = RE_DD.match(ln)
+        if m:
+            if params is not None:
+                yield params
+            params = m.group(2).split(" ")[0]
+            continue
+        m = RE_CONT.match(ln)
+        if m and params is not None and params.endswith(","):
+            params += m.group(1).split(" ")[0]
+            continue
+        if params is not None:
+            yield params
+            params = None
+    if params is not None:
+        yield params
+
+
+def jcl_datasets(text: str) -> tuple:
+    """(consumed, produced) catalogued DSNs of one JCL member."""
+    consumed, produced = set(), set()
+    for params in dd_statements(text):
+        m = RE_DSN.search(params)
+        if not m or m.group(1).startswith("&&"):
+            continue
+        dsn = RE_GDG.sub("", m.group(1))
+        d = RE_DISP.search(params)
+        disp = d.group(1).strip("()").split(",") if d else ["NEW"]
+        status = disp[0] or "NEW"
+        normal = disp[1] if len(disp) > 1 else ""
+        if status in ("SHR", "OLD"):
+            consumed.add(dsn)
+        elif status == "NEW" or (status == "MOD" and normal != "DELETE"):
+            produced.add(dsn)
+    return consumed, produced
+
+
+def file_stem(path: str) -> str:
+    name = os.path.basename(path)
+    return "py:" + (name.rsplit(".", 1)[0] if "." in name else name)
+
+
+def python_datasets(text: str) -> tuple:
+    """(consumed, produced) dataset stems named in a job port."""
+    consumed = {file_stem(next(filter(None, g))) for g in RE_PY_IN.findall(text)}
+    produced = {file_stem(next(filter(None, g))) for g in RE_PY_OUT.findall(text)}
+    return consumed, produced
+
+
+def discover_jobs(job_dir: str = JOB_DIR) -> dict:
+    """job -> {"script", "consumes", "produces"} for every member with a port."""
+    jobs = {}
+    for member in sorted(glob.glob(os.path.join(job_dir, "*.txt"))):
+        name = os.path.splitext(os.path.basename(member))[0]
+        if name not in PORTS:
+            raise ValueError(f"{member}: no port listed in scheduler.PORTS")
+        script = os.path.join(job_dir, PORTS[name])
+        if not os.path.exists(script):
+            raise FileNotFoundError(f"{name}: port {script} does not exist")
+        with open(member, encoding="latin-1") as f:
+            jcl_in, jcl_out = jcl_datasets(f.read())
+        with open(script, encoding="utf-8") as f:
+            py_in, py_out = python_datasets(f.read())
+        produces = jcl_out | py_out
+        jobs[name] = {
+            "script": script,
+            "consumes": (jcl_in | py_in) - produces,    # own outputs are internal
+            "produces": produces,
+        }
+    return jobs
+
+
+def build_graph(jobs: dict) -> dict:
+    """job -> set of jobs it depends on."""
+    producers = {}
+    for name, job in jobs.items():
+        for ds in job["produces"]:
+            producers.setdefault(ds, set()).add(name)
+    return {
+        name: {p for ds in job["consumes"] for p in producers.get(ds, ()) if p != name}
+        for name, job in jobs.items()
+    }
+
+
+#-------------------------------------------------------------------#
+# Critical path                                                     #
+#-------------------------------------------------------------------#
+def load_durations(path: str) -> dict:
+    """Last recorded wall time per job from a profiler JSON-lines log."""
+    durations = {}
+    if path and path != "-" and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                durations[rec.get("job")] = rec.get("wall_s", 1.0)
+    return durations
+
+
+def topo_order(deps: dict) -> list:
+    order, done = [], set()
+    pending = dict(deps)
+    while pending:
+        ready = sorted(j for j, d in pending.items() if d <= done)
+        if not ready:
+            raise ValueError(f"dependency cycle among jobs: {sorted(pending)}")
+        for j in ready:
+            order.append(j)
+            done.add(j)
+            del pending[j]
+    return order
+
+
+def critical_rank(deps: dict, durations: dict) -> dict:
+    """Longest remaining chain (own duration included) starting at each job."""
+    children = {j: set() for j in deps}
+    for j, parents in deps.items():
+        for p in parents:
+            children[p].add(j)
+    rank = {}
+    for j in reversed(topo_order(deps)):
+        rank[j] = durations.get(j, 1.0) + max((rank[c] for c in children[j]), default=0.0)
+    return rank
+
+
+#-------------------------------------------------------------------#
+# Runner                                                            #
+#-------------------------------------------------------------------#
+def run_job(script: str) -> int:
+    return subprocess.run([sys.executable, script], cwd=os.getcwd()).returncode
+
+
+def run_stream(jobs: dict, deps: dict, max_workers: int = None, durations: dict = None) -> dict:
+    """Run every job once its producers succeeded; returns job -> status."""
+    rank = critical_rank(deps, durations or {})
+    status = {}
+    running = {}
+    max_workers = max_workers or os.cpu_count() or 1
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while len(status) < len(jobs):
+            for j in jobs:
+                if j not in status and j not in running.values() and any(
+                    status.get(p) in ("failed", "skipped") for p in deps[j]
+                ):
+                    status[j] = "skipped"
+            ready = sorted(
+                (j for j in jobs
+                 if j not in status and j not in running.values()
+                 and all(status.get(p) == "ok" for p in deps[j])),
+                key=lambda j: -rank[j],
+            )
+            for j in ready[: max_workers - len(running)]:
+                print(f"[scheduler] start {j} (critical path {rank[j]:.1f}s)", flush=True)
+                running[pool.submit(run_job, jobs[j]["script"])] = j
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                j = running.pop(fut)
+                status[j] = "ok" if fut.result() == 0 else "failed"
+                print(f"[scheduler] {status[j]:<6} {j}", flush=True)
+    return status
+
+
+def components(deps: dict, rank: dict = None) -> list:
+    """Connected groups of jobs, each in dependency order (longest chain first
+    among the jobs ready at each point, when rank is given)."""
+    group = {j: {j} for j in deps}
+    for j, parents in deps.items():
+        for p in parents:
+            if group[p] is not group[j]:
+                merged = group[p] | group[j]
+                for k in merged:
+                    group[k] = merged
+    order = topo_order(deps)
+    seen, out = set(), []
+    for j in order:
+        if j not in seen:
+            members = group[j]
+            seen |= members
+            out.append(serial_order({k: deps[k] for k in order if k in members}, rank or {}))
+    return out
+
+
+def serial_order(deps: dict, rank: dict) -> list:
+    """One job at a time: of the jobs whose producers are done, the highest rank next."""
+    order, done = [], set()
+    while len(order) < len(deps):
+        ready = [j for j in sorted(deps) if j not in done and deps[j] <= done]
+        j = max(ready, key=lambda k: rank.get(k, 0.0))
+        order.append(j)
+        done.add(j)
+    return order
+
+
+def run_chain(chain: list, deps: dict) -> dict:
+    """Worker: run a group of jobs in this process (handoffs stay in memory)."""
+    if JOB_DIR not in sys.path:
+        sys.path.insert(0, JOB_DIR)
+    import runpy
+    import catalog
+    import profiler
+    import writer
+
+    status = {}
+    for name, script in chain:
+        if any(status.get(p) != "ok" for p in deps[name]):
+            status[name] = "skipped"
+            continue
+        profiler.RUN = profiler.Run(name)
+        try:
+            runpy.run_path(script, run_name="__main__")
+            status[name] = "ok"
+        except SystemExit as e:
+            status[name] = "ok" if not e.code else "failed"
+        except Exception:
+            traceback.print_exc()
+            status[name] = "failed"
+        profiler.emit()
+    profiler.RUN = profiler.Run("scheduler")
+    try:
+        writer.flush()      # worker processes skip atexit: finish the audit copies here
+    except Exception:
+        traceback.print_exc()
+        status = {j: ("failed" if s == "ok" else s) for j, s in status.items()}
+    catalog.HANDOFF.clear()     # the worker may be reused for another group
+    return status
+
+
+def run_in_process(jobs: dict, deps: dict, max_workers: int = None, durations: dict = None) -> dict:
+    """One worker process per connected group, its jobs run serially; longest
+    critical path first."""
+    rank = critical_rank(deps, durations or {})
+    groups = sorted(components(deps, rank), key=lambda g: -max(rank[j] for j in g))
+    status = {}
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as pool:
+        futures = []
+        for g in groups:
+            print(f"[scheduler] start {' -> '.join(g)}", flush=True)
+            chain = [(j, jobs[j]["script"]) for j in g]
+            futures.append(pool.submit(run_chain, chain, {j: deps[j] for j in g}))
+        for fut in futures:
+            for j, s in fut.result().items():
+                status[j] = s
+                print(f"[scheduler] {s:<6} {j}", flush=True)
+    return status
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Run the CIS batch stream in dependency order.")
+    ap.add_argument("jobs", nargs="*", help="limit to these jobs (default: all)")
+    ap.add_argument("-j", "--workers", type=int, default=None)
+    ap.add_argument("--history", default=os.environ.get("CIS_PROFILE", ""),
+                    help="profiler JSON-lines log used to weight the critical path")
+    ap.add_argument("--dry-run", action="store_true", help="print the plan only")
+    ap.add_argument("--in-process", action="store_true",
+                    help="run each connected group of jobs in one process, handing frames over in "
+                         "memory; jobs of a group then run one after another, not concurrently")
+    args = ap.parse_args(argv)
+
+    jobs = discover_jobs()
+    if args.jobs:
+        jobs = {j: jobs[j] for j in args.jobs}
+    deps = {j: d & set(jobs) for j, d in build_graph(jobs).items()}
+    durations = load_durations(args.history)
+
+    if args.dry_run:
+        rank = critical_rank(deps, durations)
+        for j in topo_order(deps):
+            after = ", ".join(sorted(deps[j])) or "-"
+            script = os.path.basename(jobs[j]["script"])
+            print(f"{j:<10} {script:<14} after {after:<30} critical path {rank[j]:.1f}s")
+        return 0
+
+    t0 = time.perf_counter()
+    runner = run_in_process if args.in_process else run_stream
+    status = runner(jobs, deps, args.workers, durations)
+    print(f"[scheduler] done in {time.perf_counter() - t0:.1f}s: "
+          + ", ".join(f"{j}={s}" for j, s in sorted(status.items())))
+    return 0 if all(s == "ok" for s in status.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import polars as pl
+
+#-------------------------------------------------------------------#
+# Sort-order tracking                                               #
+#-------------------------------------------------------------------#
+# The ports copied every PROC SORT that preceded a MERGE. Polars    #
+# joins hash their keys and do not need sorted input, so those      #
+# sorts are gone; the ones left fix the order of an output (or of   #
+# a keep="first"/"last" dedup) and go through order_by():           #
+#     indvdly = order_by(indvdly, "CISNO")                          #
+# order_by skips the sort when the frame is already in that order   #
+# (the key's sorted flag, else one O(n) pass over adjacent rows),   #
+# and either way leaves the leading key flagged as sorted, so later #
+# group_by / join / unique / filter take Polars' sorted fast paths. #
+# presorted() sets the same flag on an input that arrives in key    #
+# order (e.g. written by an order_by upstream) without sorting it.  #
+#-------------------------------------------------------------------#
+
+
+def as_keys(by) -> list:
+    return [by] if isinstance(by, str) else list(by)
+
+
+def as_descending(descending, n: int) -> list:
+    return list(descending) if isinstance(descending, (list, tuple)) else [descending] * n
+
+
+def flagged(df: pl.DataFrame, key: str, descending: bool = False) -> bool:
+    flags = df[key].flags
+    return flags["SORTED_DESC" if descending else "SORTED_ASC"]
+
+
+def is_ordered(df: pl.DataFrame, by, descending=False) -> bool:
+    """True when df's rows are already in `by` order (nulls first, as sort())."""
+    keys = as_keys(by)
+    desc = as_descending(descending, len(keys))
+    if df.height < 2:
+        return True
+    if len(keys) == 1 and flagged(df, keys[0], desc[0]):
+        return True
+    if df.select(pl.any_horizontal(pl.col(keys).is_null().any())).item():
+        return False
+
+    # lexicographic "row i <= row i+1", compared from the last key back
+    ok = pl.lit(True)
+    for k, d in reversed(list(zip(keys, desc))):
+        cur, nxt = pl.col(k), pl.col(k).shift(-1)
+        ahead = nxt < cur if d else nxt > cur
+        ok = ahead | ((nxt == cur) & ok)
+    return df.select(ok.head(df.height - 1).all()).item()
+
+
+def mark_sorted(frame, by, descending=False):
+    """Flag the leading key as sorted (the only flag Polars keeps)."""
+    lead = as_keys(by)[0]
+    return frame.with_columns(pl.col(lead).set_sorted(descending=as_descending(descending, 1)[0]))
+
+
+def presorted(df: pl.DataFrame, by, descending=False) -> pl.DataFrame:
+    """Flag an input already in `by` order; a frame that is not is returned untouched."""
+    if is_ordered(df, by, descending):
+        return mark_sorted(df, by, descending)
+    return df
+
+
+def order_by(frame, by, descending=False):
+    """A sort that defines output order; free when the frame is already ordered.
+
+    Like PROC SORT (EQUALS) the sort is stable: ties keep their input order.
+    """
+    keys = as_keys(by)
+    desc = as_descending(descending, len(keys))
+    if isinstance(frame, pl.LazyFrame):
+        return frame.sort(keys, descending=desc, maintain_order=True)
+    if is_ordered(frame, keys, desc):
+        return mark_sorted(frame, keys, desc)
+    return frame.sort(keys, descending=desc, maintain_order=True)
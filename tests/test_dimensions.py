@@ -0,0 +1,46 @@
+import polars as pl
+import pytest
+from catalog import HANDOFF
+from dimensions import DIMENSIONS, dimension
+
+
+@pytest.fixture
+def occupat():
+    HANDOFF["OCCUPAT"] = pl.DataFrame({
+        "TYPE": ["OCCUP", "OCCUP", "OCCUP"],
+        "DEMOCODE": ["001", "002", "001"],
+        "DEMODESC": ["CLERK", "ENGINEER", "SECOND ROW"],
+    })
+    yield
+    HANDOFF.pop("OCCUPAT")
+    DIMENSIONS.clear()
+
+
+def test_lookup_first_row_per_key(occupat):
+    occ = dimension("OCCUPAT", "DEMOCODE")
+    df = pl.DataFrame({"DEMOCODE": ["002", "001", "999", None]})
+    out = df.with_columns(occ.lookup("DEMOCODE", ["DEMODESC"]))
+    assert out.get_column("DEMODESC").to_list() == ["ENGINEER", "CLERK", None, None]
+
+
+def test_values_default_to_the_table_columns(occupat):
+    assert dimension("OCCUPAT", "DEMOCODE").values.columns == ["TYPE", "DEMODESC"]
+
+
+def test_missing_value_column_raises(occupat):
+    with pytest.raises(ValueError, match="OCCUPAT has no column CODEDESC"):
+        dimension("OCCUPAT", "DEMOCODE", "CODEDESC")
+    with pytest.raises(ValueError, match="OCCUPAT has no column OCCUPDESC"):
+        dimension("OCCUPAT", "DEMOCODE").lookup("DEMOCODE", ["OCCUPDESC"])
+
+
+def test_key_of_another_kind_raises(occupat):
+    HANDOFF["OCCUPN"] = pl.DataFrame({"CODE": [1, 2], "DESC": ["ONE", "TWO"]})
+    try:
+        occ = dimension("OCCUPN", "CODE", "DESC")
+        df = pl.DataFrame({"CODE": ["002", "X1"]})
+        assert df.head(1).with_columns(occ.lookup("CODE")).get_column("DESC").to_list() == ["TWO"]
+        with pytest.raises(pl.exceptions.InvalidOperationError):
+            df.with_columns(occ.lookup("CODE"))
+    finally:
+        HANDOFF.pop("OCCUPN")
@@ -0,0 +1,47 @@
+import polars as pl
+from fanin import FanIn
+
+MERGEALL = pl.DataFrame({
+    "ACCTNOC": [10, 20, 30, 30],
+    "CUSTNO": ["C1", "C2", "C3", "C3B"],
+    "BRANCH_ABBR": ["KL", "PJ", "JB", "XX"],
+})
+LOANS = pl.DataFrame({
+    "ACCTNOC": [30, 10, 99, 10],
+    "LEDGERBAL": [5.5, 1.0, 7.0, 2.0],
+    "BRANCH_ABBR": ["L1", "L2", "L3", "L4"],
+})
+SAFEBOX = pl.DataFrame({
+    "ACCTNOC": [20],
+    "BOXSIZE": [3],
+    "LEDGERBAL": [1],
+})
+
+
+def test_matches_are_inner_and_nodupkey():
+    accounts = FanIn(MERGEALL, "ACCTNOC", [LOANS, SAFEBOX])
+    loans, safebox = accounts.matches
+    assert loans.sort("ACCTNOC").rows() == [(10, "C1", "KL", 1.0, "L2"), (30, "C3", "JB", 5.5, "L1")]
+    assert loans.columns == ["ACCTNOC", "CUSTNO", "BRANCH_ABBR", "LEDGERBAL", "BRANCH_ABBR_right"]
+    assert safebox.rows() == [(20, "C2", "PJ", 3, 1)]
+
+
+def test_schema_is_settled_once_from_different_column_sets():
+    accounts = FanIn(MERGEALL, "ACCTNOC", [LOANS, SAFEBOX])
+    assert list(accounts.schema) == [
+        "ACCTNOC", "CUSTNO", "BRANCH_ABBR", "LEDGERBAL", "BRANCH_ABBR_right", "BOXSIZE",
+    ]
+    # LEDGERBAL is Float64 in LOANS and Int64 in SAFEBOX
+    assert accounts.schema["LEDGERBAL"] == pl.Float64
+
+
+def test_stream_sets_parts_with_different_columns():
+    accounts = FanIn(MERGEALL, "ACCTNOC", [LOANS, SAFEBOX])
+    loans, safebox = accounts.matches
+    deposits = pl.DataFrame({"ACCTNOC": [40], "CUSTNO": ["C4"], "DPTYPE": ["SA"]})
+    out = accounts.stream([deposits, loans, safebox])
+    assert out.columns == list(accounts.schema) + ["DPTYPE"]
+    assert out.height == 4
+    assert out.get_column("LEDGERBAL").to_list() == [None, 1.0, 5.5, 1.0]
+    assert out.get_column("BOXSIZE").to_list() == [None, None, None, 3]
+    assert out.get_column("DPTYPE").to_list() == ["SA", None, None, None]
@@ -0,0 +1,40 @@
+import polars as pl
+import pytest
+from keys import KEY_DTYPE, decode_keys, encode_keys, encode_together, to_key
+
+
+def test_padded_and_unpadded_keys_encode_and_join():
+    main = pl.DataFrame({"CISNO": ["00000000123", "00000000456"]})
+    cart = pl.DataFrame({"CUSTNO": ["123", " 456"]})
+    main, cart = encode_together([(main, "CISNO"), (cart, "CUSTNO")])
+    assert main.schema["CISNO"] == cart.schema["CUSTNO"] == KEY_DTYPE
+    joined = main.join(cart, left_on="CISNO", right_on="CUSTNO")
+    assert decode_keys(joined, "CISNO").get_column("CISNO").to_list() == ["00000000123", "00000000456"]
+
+
+def test_integer_key_read_as_text_meets_padded_key():
+    primary = pl.DataFrame({"CUSTNO": [123]}).with_columns(pl.col("CUSTNO").cast(pl.Utf8))
+    edges = pl.DataFrame({"CUSTNO1": ["00000000123"]})
+    primary, edges = encode_together([(primary, "CUSTNO"), (edges, "CUSTNO1")])
+    assert primary.join(edges, left_on="CUSTNO", right_on="CUSTNO1").height == 1
+
+
+def test_text_fallback_still_pads_digit_keys():
+    main = pl.DataFrame({"CISNO": ["00000000123", "A1234567"]})
+    cart = pl.DataFrame({"CUSTNO": ["123", "A1234567"]})
+    main, cart = encode_together([(main, "CISNO"), (cart, "CUSTNO")])
+    assert main.schema["CISNO"] == cart.schema["CUSTNO"] == pl.Utf8
+    assert cart.get_column("CUSTNO").to_list() == ["00000000123", "A1234567"]
+    assert main.join(cart, left_on="CISNO", right_on="CUSTNO").height == 2
+
+
+def test_longer_number_stays_text():
+    df = encode_keys(pl.DataFrame({"CUSTNO": ["123456789012"]}), "CUSTNO")
+    assert df.get_column("CUSTNO").to_list() == ["123456789012"]
+
+
+def test_to_key_blank_is_null_and_letters_raise():
+    df = pl.DataFrame({"ACCTNOC": ["00000000042", "  "]})
+    assert df.select(to_key(pl.col("ACCTNOC"))).to_series().to_list() == [42, None]
+    with pytest.raises(pl.exceptions.InvalidOperationError):
+        pl.DataFrame({"ACCTNOC": ["12A"]}).select(to_key(pl.col("ACCTNOC")))
@@ -0,0 +1,26 @@
+import polars as pl
+import pytest
+from fixedwidth import read_fb
+from layout import apply_schema, compile_item
+
+
+def test_input_zw_reads_as_zoned(tmp_path):
+    field = compile_item("CODE", 1, "Z3.", "input")
+    assert field.kind == "zoned"
+    assert compile_item("CODE", 1, "Z3.", "put").kind == "zfill"
+    path = tmp_path / "CODES"
+    path.write_bytes("042007".encode("cp037"))
+    assert read_fb(str(path), [field]).get_column("CODE").to_list() == [42, 7]
+
+
+def test_apply_schema_blank_is_null():
+    df = pl.DataFrame({"BANKNO": ["12", "  ", None]})
+    out = apply_schema(df, {"BANKNO": pl.Int16})
+    assert out.get_column("BANKNO").to_list() == [12, None, None]
+
+
+def test_apply_schema_raises_on_values_that_do_not_fit():
+    with pytest.raises(pl.exceptions.InvalidOperationError):
+        apply_schema(pl.DataFrame({"BANKNO": [40000]}), {"BANKNO": pl.Int16})
+    with pytest.raises(pl.exceptions.InvalidOperationError):
+        apply_schema(pl.DataFrame({"BANKNO": ["1A"]}), {"BANKNO": pl.Int16})
@@ -0,0 +1,25 @@
+import pytest
+import reader
+from fixedwidth import Field
+
+FIELDS = [Field("CUSTNO", 1, 11), Field("NAME", 12, 20)]
+
+
+@pytest.fixture
+def rawdir(tmp_path, monkeypatch):
+    monkeypatch.setattr(reader, "RAWDATA_DIR", str(tmp_path))
+    (tmp_path / "TESTFB").write_bytes(b"\x40" * 64)
+    yield tmp_path
+    reader.FB_DATASETS.pop("TESTFB", None)
+
+
+def test_layout_past_lrecl_raises():
+    with pytest.raises(ValueError, match="past LRECL 20"):
+        reader.register_fb("TESTFB", FIELDS, lrecl=20)
+
+
+def test_raw_unload_needs_the_dcb_lrecl(rawdir):
+    reader.register_fb("TESTFB", FIELDS)
+    assert reader.resolve("TESTFB") == (reader.converted_path("TESTFB"), False)
+    reader.register_fb("TESTFB", FIELDS, lrecl=32)
+    assert reader.resolve("TESTFB") == (str(rawdir / "TESTFB"), True)
@@ -0,0 +1,34 @@
+import polars as pl
+import pytest
+import rhold
+from catalog import PATHS, register_path
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setattr(rhold, "INDEX_DIR", str(tmp_path / "index"))
+    path = tmp_path / "TESTRHOLD.parquet"
+    register_path("TESTRHOLD", str(path))
+    yield path
+    PATHS.pop("TESTRHOLD")
+
+
+def write(path, ids):
+    pl.DataFrame({"ID1": ids, "ID2": [""] * len(ids)}).write_parquet(path)
+
+
+def test_index_is_reused_while_the_stamp_matches(source, monkeypatch):
+    write(source, ["B2", "A1", "B2"])
+    assert rhold.load_index("TESTRHOLD").to_list() == ["A1", "B2"]
+
+    def rebuild(ids):
+        raise AssertionError("index rebuilt for an unchanged source")
+    monkeypatch.setattr(rhold, "build", rebuild)
+    assert rhold.load_index("TESTRHOLD").to_list() == ["A1", "B2"]
+
+
+def test_index_is_rebuilt_when_the_source_changes(source):
+    write(source, ["A1"])
+    assert rhold.load_index("TESTRHOLD").to_list() == ["A1"]
+    write(source, ["C3", "A1", "D4444"])
+    assert rhold.load_index("TESTRHOLD").to_list() == ["A1", "C3", "D4444"]
@@ -0,0 +1,78 @@
+from collections import deque
+import numpy as np
+import polars as pl
+import pytest
+from rlngraph import build, groups
+
+
+def graph(pairs, codes=None):
+    edges = pl.DataFrame(
+        {"CUSTNO1": [a for a, _ in pairs], "CUSTNO2": [b for _, b in pairs],
+         "CODE1": codes or ["001"] * len(pairs), "CODE2": codes or ["001"] * len(pairs)},
+        schema_overrides={"CUSTNO1": pl.UInt64, "CUSTNO2": pl.UInt64},
+    )
+    return build(edges)
+
+
+def labels(g, **kw):
+    df = groups(g, **kw)
+    return dict(zip(df.get_column("CUSTNO").to_list(), df.get_column("GROUPID").to_list()))
+
+
+def reference(pairs, max_hops):
+    """Seeds in CUSTNO order, each taking the ungrouped customers within max_hops."""
+    near = {}
+    for a, b in pairs:
+        near.setdefault(a, set()).add(b)
+        near.setdefault(b, set()).add(a)
+    group = {}
+    for seed in sorted(near):
+        if seed in group:
+            continue
+        group[seed] = seed
+        queue = deque([(seed, 0)])
+        while queue:
+            node, hops = queue.popleft()
+            if hops == max_hops:
+                continue
+            for other in near[node]:
+                if other not in group:
+                    group[other] = seed
+                    queue.append((other, hops + 1))
+    return group
+
+
+def test_components():
+    assert labels(graph([(3, 1), (1, 2), (7, 8)])) == {1: 1, 2: 1, 3: 1, 7: 7, 8: 7}
+
+
+def test_codes_filter():
+    g = graph([(1, 2), (2, 3)], codes=["001", "050"])
+    assert labels(g, codes=["050"]) == {1: 1, 2: 2, 3: 2}
+
+
+def test_max_hops_chain_is_a_partition():
+    # 1-2-3-4-5-6: seed 1 takes 2, seed 3 takes 4, seed 5 takes 6
+    chain = [(i, i + 1) for i in range(1, 6)]
+    assert labels(graph(chain), max_hops=1) == {1: 1, 2: 1, 3: 3, 4: 3, 5: 5, 6: 5}
+    assert labels(graph(chain), max_hops=0) == {i: i for i in range(1, 7)}
+    assert set(labels(graph(chain), max_hops=5).values()) == {1}
+
+
+def test_max_hops_walks_through_ungrouped_customers_only():
+    # 1-2-3 and 1-4-5-3: 3 is two hops from seed 1, 5 only via 4 or 3
+    pairs = [(1, 2), (2, 3), (1, 4), (4, 5), (5, 3)]
+    assert labels(graph(pairs), max_hops=2) == {1: 1, 2: 1, 3: 1, 4: 1, 5: 1}
+    assert labels(graph(pairs), max_hops=1) == {1: 1, 2: 1, 4: 1, 3: 3, 5: 3}
+
+
+@pytest.mark.parametrize("max_hops", [1, 2, 3])
+def test_max_hops_matches_reference(max_hops):
+    rng = np.random.default_rng(max_hops)
+    pairs = [tuple(int(x) for x in p) for p in rng.integers(1, 200, size=(250, 2)) if p[0] != p[1]]
+    assert labels(graph(pairs), max_hops=max_hops) == reference(pairs, max_hops)
+
+
+def test_negative_max_hops():
+    with pytest.raises(ValueError):
+        groups(graph([(1, 2)]), max_hops=-1)
@@ -0,0 +1,15 @@
+from scheduler import components, critical_rank
+
+
+def test_group_runs_the_longest_branch_first():
+    deps = {"CCRCCRLN": set(), "CCRCCRL1": {"CCRCCRLN"}, "CICMDRPT": {"CCRCCRLN"}, "CCRNIDIC": set()}
+    rank = critical_rank(deps, {"CICMDRPT": 30.0, "CCRCCRL1": 2.0})
+    groups = components(deps, rank)
+    assert ["CCRCCRLN", "CICMDRPT", "CCRCCRL1"] in groups
+    assert ["CCRNIDIC"] in groups
+
+
+def test_group_order_respects_dependencies():
+    deps = {"A": set(), "B": {"A"}, "C": {"B"}, "D": {"A"}}
+    rank = {"A": 1.0, "B": 2.0, "C": 1.0, "D": 5.0}
+    assert components(deps, rank) == [["A", "D", "B", "C"]]
@@ -0,0 +1,42 @@
+import polars as pl
+from fixedwidth import Field
+from profiler import RUN
+from writer import flush, publish, put_lines
+
+
+def put(values, kind, width, decimals=0):
+    df = pl.DataFrame({"AMT": values}, schema={"AMT": pl.Float64})
+    return put_lines(df, [Field("AMT", 1, width, kind, decimals)]).to_list()
+
+
+def test_number_fits():
+    assert put([12.5, 0.0], "number", 6, 2) == [" 12.50", "  0.00"]
+
+
+def test_number_overflow_is_asterisks():
+    assert put([1234567.0], "number", 6, 2) == ["******"]
+
+
+def test_negative_number():
+    assert put([-12.5], "number", 6, 2) == ["-12.50"]
+    assert put([-123.5], "number", 6, 2) == ["******"]
+
+
+def test_missing_number_is_dot():
+    assert put([None], "number", 6, 2) == ["     ."]
+    assert put([None], "zfill", 4) == ["   ."]
+
+
+def test_zfill_overflow_is_asterisks():
+    assert put([42.0], "zfill", 4) == ["0042"]
+    assert put([12345.0], "zfill", 4) == ["****"]
+
+
+def test_persist_is_profiled(tmp_path):
+    df = pl.DataFrame({"CUSTNO": ["00000000001", "00000000002"]})
+    publish("TESTOUT", df, str(tmp_path / "TESTOUT.parquet"), str(tmp_path / "TESTOUT.csv"))
+    flush()
+    steps = {s["step"]: s for s in RUN.steps}
+    assert steps["persist TESTOUT.parquet"]["rows_out"] == 2
+    assert steps["persist TESTOUT.csv"]["wall_s"] >= 0
+    assert pl.read_parquet(tmp_path / "TESTOUT.parquet").equals(df)
@@ -0,0 +1,147 @@
+import atexit
+import os
+from concurrent.futures import ThreadPoolExecutor
+import polars as pl
+from catalog import HANDOFF
+from fixedwidth import Field
+from layout import Layout
+from profiler import background
+
+#-------------------------------------------------------------------#
+# Fixed-width PUT writer                                            #
+#-------------------------------------------------------------------#
+# Builds every output line as one Polars string column from a PUT   #
+# layout (see layout.py), then writes the column out in one go:     #
+#   $w.   -> left-justified, blank padded, truncated to w           #
+#   w.d   -> right-justified number, '.' when missing               #
+#   Zw.d  -> zero-filled number, '.' when missing                   #
+#   a number wider than w is w asterisks, as SAS writes an overflow #
+#   'xx'  -> literal text                                           #
+# Gaps between @positions are blank, as in a SAS PUT.               #
+#-------------------------------------------------------------------#
+
+
+def number_text(expr: pl.Expr, decimals: int) -> pl.Expr:
+    """Fixed-decimal text of a numeric column (w.d / Zw.d), without padding."""
+    if not decimals:
+        return expr.cast(pl.Float64).round(0).cast(pl.Int64).cast(pl.Utf8)
+    scaled = (expr.cast(pl.Float64) * 10 ** decimals).round(0).cast(pl.Int64)
+    digits = scaled.abs().cast(pl.Utf8).str.zfill(decimals + 1)
+    sign = pl.when(scaled < 0).then(pl.lit("-")).otherwise(pl.lit(""))
+    return pl.concat_str([
+        sign,
+        digits.str.slice(0, digits.str.len_chars() - decimals),
+        pl.lit("."),
+        digits.str.slice(-decimals),
+    ])
+
+
+def put_expr(f: Field, columns) -> pl.Expr:
+    """Exactly f.width characters for one PUT item."""
+    if f.kind == "literal":
+        return pl.lit(f.name)
+    if f.name not in columns:
+        # SAS writes an uninitialised variable as blank
+        return pl.lit(" " * f.width)
+
+    col = pl.col(f.name)
+    if f.kind in ("number", "zfill"):
+        text = number_text(col, f.decimals)
+        if f.kind == "zfill":
+            text = text.str.zfill(f.width)
+        text = text.fill_null(".").str.pad_start(f.width)
+        return pl.when(text.str.len_chars() > f.width).then(pl.lit("*" * f.width)).otherwise(text)
+    return col.cast(pl.Utf8).fill_null("").str.slice(0, f.width).str.pad_end(f.width)
+
+
+def line_expr(fields, columns, lrecl: int = None) -> pl.Expr:
+    """One string expression for the whole record, blank-filling @position gaps."""
+    parts = []
+    pos = 1
+    for f in sorted(fields, key=lambda f: f.start):
+        if f.start < pos:
+            raise ValueError(f"PUT item {f.name!r} at @{f.start} overlaps the previous item")
+        if f.start > pos:
+            parts.append(pl.lit(" " * (f.start - pos)))
+        parts.append(put_expr(f, columns))
+        pos = f.start + f.width
+    line = pl.concat_str(parts)
+    if lrecl:
+        line = line.str.pad_end(lrecl)
+    return line.alias("LINE")
+
+
+def put_lines(df: pl.DataFrame, fields, lrecl: int = None) -> pl.Series:
+    if isinstance(fields, Layout):
+        fields = fields.fields
+    return df.select(line_expr(fields, set(df.columns), lrecl)).to_series()
+
+
+def literal_line(fields) -> str:
+    """Render a literal-only PUT (report headers written on _N_ = 1)."""
+    if isinstance(fields, Layout):
+        fields = fields.fields
+    return put_lines(pl.DataFrame({"_N_": [1]}), fields)[0]
+
+
+def write_put(df: pl.DataFrame, fields, path: str, lrecl: int = None, header=None):
+    """Write df as a fixed-width file laid out by a PUT layout.
+
+    Lines are built column-wise and serialised by Polars' multi-threaded
+    CSV writer (one unquoted column, no header), so nothing is formatted
+    row by row in Python.
+    """
+    lines = put_lines(df, fields, lrecl)
+    with open(path, "wb") as f:
+        if header is not None:
+            f.write((literal_line(header) + "\n").encode("utf-8"))
+        lines.to_frame().write_csv(f, include_header=False, quote_style="never")
+
+
+#-------------------------------------------------------------------#
+# In-process handoff with asynchronous persistence                  #
+#-------------------------------------------------------------------#
+# publish("INDVDLY", df, "cis_internal/output/INDVDLY.parquet", ...) #
+# makes df available to load_input("INDVDLY") in the same process   #
+# at once, and writes the audit copies on a background thread. A    #
+# downstream job run in-process (scheduler.py --in-process) thus    #
+# never waits on the parquet/CSV encode, write, read and decode.    #
+# flush() waits for the writes; it runs at exit and re-raises the   #
+# first write error. Each write is a profiler step of its own       #
+# ("persist INDVDLY.parquet"), so the run record shows what the     #
+# encode and write cost, not just the queueing in publish().        #
+#-------------------------------------------------------------------#
+PERSIST = ThreadPoolExecutor(max_workers=2, thread_name_prefix="persist")
+PENDING = []
+
+
+def persist(df: pl.DataFrame, path: str):
+    """Write one copy (format by extension), atomically via a temp file."""
+    tmp = f"{path}.tmp"
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in (".parquet", ".csv"):
+        raise ValueError(f"don't know how to persist {path!r}")
+    with background(f"persist {os.path.basename(path)}", df) as s:
+        if ext == ".parquet":
+            df.write_parquet(tmp)
+        else:
+            df.write_csv(tmp)
+        os.replace(tmp, path)
+        s.output(df)
+
+
+def publish(name: str, df: pl.DataFrame, *paths):
+    HANDOFF[name] = df
+    for path in paths:
+        PENDING.append(PERSIST.submit(persist, df, path))
+
+
+def flush():
+    futures = PENDING[:]
+    PENDING.clear()
+    errors = [f.exception() for f in futures if f.exception() is not None]
+    if errors:
+        raise errors[0]
+
+
+atexit.register(flush)